@@ -0,0 +1,229 @@
+# bench_bot.py
+# End-to-end throughput benchmark against a fake Supabase and fake Discord, no network needed.
+# Drives remind_me_logic, gif_autocomplete, stats and check_for_reminders (backlog catch-up + reconcile),
+# reports ops/sec and p50/p99 latency, and saves the results per commit for comparison.
+# Run from the repo root:
+#   python benchmarks/bench_bot.py [--reminders N] [--users N] [--ops N] [--compare FILE]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_supabase import FakeSupabase  # noqa: E402
+from fake_discord import FakeClient  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+WORDS = ("dance", "hug", "slap", "wave", "cry", "laugh", "facepalm", "shrug", "party", "yeet", "bonk", "vibe")
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: list, seconds: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "ops": len(latencies),
+        "seconds": round(seconds, 4),
+        "ops_per_sec": round(len(latencies) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+async def run_ops(op, count: int, concurrency: int) -> dict:
+    # Runs op(i) for i in range(count) with at most `concurrency` in flight
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            started_at = time.perf_counter()
+            await op(i)
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return summarize(latencies, time.perf_counter() - started_at)
+
+def seed(fake: FakeSupabase, args, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    fake.seed("gifs", [
+        {"name": f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{i}", "link": f"https://gifs.example.invalid/{i}.gif", "category": "general"}
+        for i in range(args.gifs)
+    ])
+    fake.seed("user_preferences", [
+        {"user_id": str(1000 + i), "timezone": rng.choice(("+00:00", "+05:30", "-04:00"))} for i in range(0, args.users, 2)
+    ])
+    fake.seed("command_usage", [
+        {"user_id": str(1000 + i), "command_name": rng.choice(WORDS), "usage_count": rng.randint(1, 50)} for i in range(args.users)
+    ])
+    reminders = []
+    for i in range(args.reminders):
+        recurrence = "daily" if i % 5 == 0 else "none"
+        due = now - timedelta(seconds=rng.randint(1, 300))
+        reminders.append({
+            "user_id": str(1000 + i % args.users),
+            "channel_id": str(500 + i % args.channels),
+            "message": f"benchmark reminder {i}",
+            "reminder_time": due.isoformat(),
+            "set_time": (due - timedelta(hours=1)).isoformat(),
+            "recurrence": recurrence,
+            "recurrence_time": due.strftime("%H:%M") if recurrence != "none" else None,
+            "next_occurrence": None,
+            "is_sent": False,
+        })
+    fake.seed("reminders", reminders)
+
+async def bench(args) -> dict:
+    rng = random.Random(args.seed)
+    fake = FakeSupabase(latency=args.supabase_latency / 1000)
+    url = await fake.start()
+    seed(fake, args, rng)
+
+    # The bot reads its configuration at import time, so point it at the fake first
+    os.environ.update({"SUPABASE_URL": url, "SUPABASE_KEY": "benchmark", "STORAGE_BACKEND": "supabase", "METRICS_PORT": "0"})
+    os.environ.setdefault("OWNER_ID", "1")
+    os.environ.setdefault("BOT_TOKEN", "benchmark")
+    import bot_setup
+    from storage import storage
+    from reminders import remind_me_logic, check_for_reminders, reminder_scheduler, delivery_pipeline, deliver_reminders
+    from gif_commands import gif_autocomplete
+    from utility_commands import stats
+
+    client = FakeClient(latency_seconds=args.discord_latency / 1000)
+    client.cache_users = not args.uncached_users
+    for i in range(args.users):
+        client.user(1000 + i)
+    for i in range(args.channels):
+        client.channel(500 + i)
+    # Reminder delivery looks users and channels up through the bot
+    bot_setup.bot.fetch_user = client.fetch_user
+    bot_setup.bot.get_user = client.get_user
+    bot_setup.bot.get_channel = client.get_channel
+    bot_setup.bot.fetch_channel = client.fetch_channel
+
+    def interaction(i):
+        return client.interaction(1000 + i % args.users, 500 + i % args.channels)
+
+    await storage.open()
+    results = {}
+    try:
+        results["remind_me"] = await run_ops(
+            lambda i: remind_me_logic(interaction(i), f"bench {i}", 3600 + i), args.ops, args.concurrency
+        )
+        queries = [rng.choice(WORDS)[:rng.randint(1, 5)] for _ in range(args.ops)]
+        results["gif_autocomplete"] = await run_ops(
+            lambda i: gif_autocomplete(interaction(i), queries[i]), args.ops, args.concurrency
+        )
+        results["stats"] = await run_ops(lambda i: stats.callback(interaction(i)), args.ops, args.concurrency)
+
+        # Delivery: every seeded reminder is already overdue, so the first reconciliation catches
+        # up on all of them page by page (anything it gives back is left to the scheduler)
+        sent_before = len(client.sent)
+        started_at = time.perf_counter()
+        started_wall = time.time()
+        delivery_pipeline.start()
+        reminder_scheduler.start(deliver_reminders)
+        await check_for_reminders()
+        due = len(reminder_scheduler)
+        deadline = time.perf_counter() + args.timeout
+        while time.perf_counter() < deadline:
+            delivered = sum(1 for row in fake.tables["reminders"] if row["is_sent"] or row["next_occurrence"])
+            if delivered >= args.reminders and len(reminder_scheduler) == 0:
+                break
+            await asyncio.sleep(0.01)
+        seconds = time.perf_counter() - started_at
+        # Steady state once the backlog is gone
+        results["reconcile"] = await run_ops(lambda i: check_for_reminders(), args.reconciles, 1)
+        reminder_scheduler.stop()
+        delivery_pipeline.stop()
+        embeds = [message for message in client.sent[sent_before:] if message.embeds and message.target.id in client.channels]
+        # Reminders for the same user and channel share a message, so count each embed
+        results["delivery"] = summarize([message.sent_at - started_wall for message in embeds for _ in message.embeds], seconds)
+        results["delivery"]["messages"] = len(embeds)
+        results["delivery"]["scheduled"] = due
+        results["delivery"]["pipeline"] = delivery_pipeline.stats()
+    finally:
+        await storage.close()
+        await fake.stop()
+    results["supabase_requests"] = fake.requests
+    results["discord_fetches"] = client.fetches
+    return results
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['commit']}{' (dirty)' if baseline.get('dirty') else ''}:")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not isinstance(result, dict) or not isinstance(before, dict):
+            continue
+        for key in ("ops_per_sec", "p50_ms", "p99_ms"):
+            if before.get(key):
+                change = (result[key] - before[key]) / before[key] * 100
+                print(f"  {name:17} {key:12} {before[key]:>12} -> {result[key]:<12} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark with a fake Supabase and fake Discord")
+    parser.add_argument("--reminders", type=int, default=2000, help="due reminders to reconcile and deliver")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--gifs", type=int, default=1000)
+    parser.add_argument("--ops", type=int, default=1000, help="operations per command scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--reconciles", type=int, default=5)
+    parser.add_argument("--supabase-latency", type=float, default=0.0, help="ms added to every fake Supabase request")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="ms added to every fake Discord call")
+    parser.add_argument("--uncached-users", action="store_true", help="users missing from the client cache (no members intent)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for delivery to finish")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args))
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "no_save", "compare")},
+        "results": results,
+    }
+    print(f"\n{'scenario':17} {'ops':>7} {'ops/sec':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        if isinstance(result, dict):
+            print(f"{name:17} {result['ops']:>7} {result['ops_per_sec']:>10} {result['p50_ms']:>9} {result['p99_ms']:>9}")
+    print(f"Supabase requests: {results['supabase_requests']}, Discord fetches: {results['discord_fetches']}")
+
+    if not args.no_save:
+        path = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {path}")
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
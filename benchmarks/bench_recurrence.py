@@ -0,0 +1,138 @@
+# bench_recurrence.py
+# Property checks and benchmark for recurrence.py against the old step-by-step loop.
+# Run from the repo root:
+#   python benchmarks/bench_recurrence.py [--cases N] [--seed N]
+
+import argparse
+import calendar
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recurrence import next_occurrence, next_occurrences, PERIODS  # noqa: E402
+
+RECURRENCES = ("daily", "weekly", "monthly", "yearly")
+
+def legacy_next_occurrence(last_time, recurrence, recurrence_time, now):
+    # The previous reminders.calculate_next_occurrence, with now passed in
+    hour, minute = map(int, recurrence_time.split(":"))
+    if recurrence == "daily":
+        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=1)
+        while next_time <= now:
+            next_time += timedelta(days=1)
+    elif recurrence == "weekly":
+        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        while next_time <= now:
+            next_time += timedelta(days=7)
+    elif recurrence == "monthly":
+        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if last_time.month == 12:
+            next_time = next_time.replace(year=last_time.year + 1, month=1)
+        else:
+            next_time = next_time.replace(month=last_time.month + 1)
+        while next_time <= now:
+            if next_time.month == 12:
+                next_time = next_time.replace(year=next_time.year + 1, month=1)
+            else:
+                next_time = next_time.replace(month=next_time.month + 1)
+    elif recurrence == "yearly":
+        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        next_time = next_time.replace(year=last_time.year + 1)
+        while next_time <= now:
+            next_time = next_time.replace(year=next_time.year + 1)
+    else:
+        raise ValueError("Invalid recurrence pattern")
+    return next_time
+
+def random_case(rng):
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(0, 3 * 365 * 86400))
+    last = now - timedelta(seconds=rng.randrange(0, rng.choice((2, 40, 400, 4000)) * 86400))
+    recurrence_time = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+    # A last occurrence on the last day of its month may have been clamped from a later anchor day
+    anchor_day = last.day
+    if last.day == calendar.monthrange(last.year, last.month)[1]:
+        anchor_day = rng.randint(last.day, 31)
+    return last, rng.choice(RECURRENCES), recurrence_time, now, anchor_day
+
+def check_properties(cases, seed):
+    rng = random.Random(seed)
+    compared = 0
+    for _ in range(cases):
+        last, recurrence, recurrence_time, now, anchor_day = random_case(rng)
+        hour, minute = map(int, recurrence_time.split(":"))
+        base = last.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        result = next_occurrence(last, recurrence, recurrence_time, now, anchor_day)
+        case = (last.isoformat(), recurrence, recurrence_time, now.isoformat(), anchor_day, result.isoformat())
+
+        assert result > now and result > base, f"not in the future: {case}"
+        assert (result.hour, result.minute, result.second) == (hour, minute, 0), f"wrong time of day: {case}"
+        if recurrence in PERIODS:
+            period = PERIODS[recurrence]
+            assert (result - base) % period == timedelta(0), f"off the period grid: {case}"
+            assert result - period <= max(now, base), f"skipped an occurrence: {case}"
+        else:
+            assert result.day == min(anchor_day, calendar.monthrange(result.year, result.month)[1]), f"not on the anchor day: {case}"
+            months = (result.year - base.year) * 12 + result.month - base.month
+            assert months % (12 if recurrence == "yearly" else 1) == 0, f"off the month grid: {case}"
+
+        # Where the old loop worked (no day overflow) and shared our "after last" rule, results must match
+        legacy_safe = anchor_day <= 28 and not (recurrence == "weekly" and base > now)
+        if legacy_safe:
+            assert result == legacy_next_occurrence(last, recurrence, recurrence_time, now), f"differs from legacy: {case}"
+            compared += 1
+
+    # Month-end and leap-day cases the old code crashed on
+    assert next_occurrence(datetime(2026, 1, 31, 9, tzinfo=timezone.utc), "monthly", "09:00",
+                           datetime(2026, 2, 1, tzinfo=timezone.utc)) == datetime(2026, 2, 28, 9, tzinfo=timezone.utc)
+    assert next_occurrence(datetime(2028, 2, 29, 9, tzinfo=timezone.utc), "yearly", "09:00",
+                           datetime(2028, 3, 1, tzinfo=timezone.utc)) == datetime(2029, 2, 28, 9, tzinfo=timezone.utc)
+    assert next_occurrence(datetime(2029, 2, 28, 9, tzinfo=timezone.utc), "yearly", "09:00",
+                           datetime(2029, 3, 1, tzinfo=timezone.utc), anchor_day=29) == datetime(2030, 2, 28, 9, tzinfo=timezone.utc)
+    # A month-end reminder returns to the 31st after being clamped, one occurrence at a time
+    row = {"reminder_time": datetime(2026, 1, 31, 9, tzinfo=timezone.utc).isoformat(), "recurrence": "monthly",
+           "recurrence_time": "09:00", "anchor_day": 31}
+    chain = []
+    for _ in range(4):
+        next_time = next_occurrences([row], datetime.fromisoformat(row["reminder_time"]))[0]
+        chain.append(next_time.day)
+        row["reminder_time"] = next_time.isoformat()
+    assert chain == [28, 31, 30, 31], f"month-end reminder drifted: {chain}"
+    print(f"properties: {cases} random cases ok (seed {seed}), {compared} matched the legacy loop")
+
+def bench(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {iterations / elapsed:>12,.0f} ops/sec  {elapsed / iterations * 1e6:>10.2f} us/op")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark recurrence.py")
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    check_properties(args.cases, args.seed)
+
+    now = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+    for recurrence, dormant_days in (("daily", 1), ("daily", 365), ("daily", 3650), ("weekly", 3650), ("monthly", 3650)):
+        last = now - timedelta(days=dormant_days)
+        iterations = 20000 if dormant_days < 365 else 2000
+        bench(f"legacy  {recurrence:<8} dormant {dormant_days:>5}d",
+              lambda: legacy_next_occurrence(last, recurrence, "09:00", now), iterations)
+        bench(f"closed  {recurrence:<8} dormant {dormant_days:>5}d",
+              lambda: next_occurrence(last, recurrence, "09:00", now), iterations)
+
+    rng = random.Random(args.seed)
+    rows = []
+    for _ in range(10000):
+        last, recurrence, recurrence_time, _, anchor_day = random_case(rng)
+        rows.append({"reminder_time": last.isoformat(), "recurrence": recurrence, "recurrence_time": recurrence_time,
+                     "anchor_day": anchor_day})
+    bench("batch next_occurrences (10k rows)", lambda: next_occurrences(rows, now), 10)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# bench_time_parser.py
+# Micro-benchmark and fuzz run for time_parser. Run from the repo root:
+#   python benchmarks/bench_time_parser.py [--iterations N] [--fuzz N] [--seed N]
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from time_parser import parse_reminder_input, parse_clock  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "time_inputs.txt")
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+# Fragments the fuzzer glues together: valid grammar pieces plus junk around them
+FRAGMENTS = [
+    "1", "10", "99", "0", "1h", "30m", "5s", "2d", "1w", "hours", "minutes", "and", ",", " ", "  ",
+    "in", "at", "on", "tomorrow", "today", "tonight", "mon", "friday", "9am", "7:30pm", "12:00",
+    "25:61", "13pm", "2026-12-25", "T08:00", "Z", "+02:00", "-", ":", ".", "p.m.", "x", "ü", "🌪️",
+]
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+
+def legacy_parse(reminder_input: str):
+    # The old prefix command: regex compiled per call, durations only
+    time_pattern = re.compile(r"(\d+)\s*(d(ays?)?|h(ours?)?|m(in(utes?)?|ins?)?|s(ec(onds?)?|ecs?)?)\b", re.IGNORECASE)
+    total_seconds = 0
+    for match in time_pattern.finditer(reminder_input):
+        value = int(match.group(1))
+        unit = match.group(2).lower()
+        total_seconds += value * {"d": 86400, "h": 3600, "m": 60, "s": 1}[unit[0]]
+    return total_seconds
+
+def bench(label, func, inputs, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in inputs:
+            func(text)
+    elapsed = time.perf_counter() - start
+    calls = iterations * len(inputs)
+    print(f"{label:<28} {calls / elapsed:>12,.0f} ops/sec  {elapsed / calls * 1e6:>8.2f} us/op")
+
+def fuzz(count, seed):
+    rng = random.Random(seed)
+    tz = timezone(timedelta(hours=rng.randint(-12, 14)))
+    slowest = (0.0, "")
+    parsed = 0
+    for _ in range(count):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8)))
+        start = time.perf_counter()
+        try:
+            result = parse_reminder_input(text, NOW, tz)
+            if result is not None:
+                result.delay_seconds(NOW)
+                parsed += 1
+            parse_clock(text)
+        except Exception as e:
+            print(f"FUZZ FAILURE for {text!r}: {type(e).__name__}: {e}")
+            return False
+        elapsed = time.perf_counter() - start
+        if elapsed > slowest[0]:
+            slowest = (elapsed, text)
+    print(f"fuzz: {count} inputs (seed {seed}), {parsed} parsed, slowest {slowest[0] * 1e6:.1f} us for {slowest[1]!r}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and fuzz time_parser")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"corpus: {len(corpus)} inputs")
+    bench("parse_reminder_input", lambda text: parse_reminder_input(text, NOW), corpus, args.iterations)
+    bench("parse_clock", parse_clock, ["07:00", "7:30pm", "12am", "25:00"], args.iterations * 10)
+    bench("legacy prefix regex", legacy_parse, corpus, args.iterations)
+    if not fuzz(args.fuzz, args.seed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# fake_discord.py
+# Minimal stand-ins for the Discord objects the bot's handlers touch (users, channels,
+# interactions, the client). Every send is recorded with a timestamp so benchmarks can
+# measure delivery, and an optional latency simulates Discord's API round trip.
+
+import asyncio
+import itertools
+import time
+
+_message_ids = itertools.count(1)
+
+class FakeMessage:
+    def __init__(self, target, content=None, embed=None, embeds=None, view=None):
+        self.id = next(_message_ids)
+        self.target = target
+        self.content = content
+        self.embeds = embeds or ([embed] if embed is not None else [])
+        self.view = view
+        self.sent_at = time.time()
+
+    async def edit(self, content=None, embed=None, embeds=None, view=None):
+        if content is not None:
+            self.content = content
+        if embed is not None or embeds is not None:
+            self.embeds = embeds or [embed]
+        if view is not None:
+            self.view = view
+        return self
+
+class FakeMessageable:
+    def __init__(self, client, id: int):
+        self.client = client
+        self.id = id
+
+    async def send(self, content=None, embed=None, embeds=None, view=None, **kwargs):
+        if self.client.latency_seconds:
+            await asyncio.sleep(self.client.latency_seconds)
+        message = FakeMessage(self, content, embed, embeds, view)
+        self.client.sent.append(message)
+        return message
+
+class FakeUser(FakeMessageable):
+    def __init__(self, client, id: int):
+        super().__init__(client, id)
+        self.name = f"user{id}"
+        self.display_name = self.name
+        self.mention = f"<@{id}>"
+        self.display_avatar = type("Asset", (), {"url": "https://cdn.example.invalid/avatar.png"})()
+        self.avatar = self.display_avatar
+
+class FakeChannel(FakeMessageable):
+    def __init__(self, client, id: int):
+        super().__init__(client, id)
+        self.name = f"channel{id}"
+        self.mention = f"<#{id}>"
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, embed=None, embeds=None, view=None, ephemeral=False, **kwargs):
+        self._done = True
+        self.interaction.message = await self.interaction.channel.send(content, embed, embeds, view)
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def autocomplete(self, choices):
+        self._done = True
+        self.interaction.choices = choices
+
+class FakeInteraction:
+    def __init__(self, client, user, channel):
+        self.client = client
+        self.user = user
+        self.channel = channel
+        self.response = FakeResponse(self)
+        self.message = None
+        self.extras = {}
+        self.choices = None
+
+class FakeClient:
+    # Plays the part of the bot for reminder delivery: get_user/get_channel and fetch_user/fetch_channel
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.latency = 0.042  # Gateway heartbeat latency reported by /ping
+        self.users = {}
+        self.channels = {}
+        self.sent = []
+        self.fetches = 0  # REST-style lookups (fetch_user / fetch_channel)
+        self.cache_users = True  # Whether get_user sees users, like a bot with the members intent
+
+    def user(self, user_id: int) -> FakeUser:
+        if user_id not in self.users:
+            self.users[user_id] = FakeUser(self, user_id)
+        return self.users[user_id]
+
+    def channel(self, channel_id: int) -> FakeChannel:
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self, channel_id)
+        return self.channels[channel_id]
+
+    def interaction(self, user_id: int, channel_id: int) -> FakeInteraction:
+        return FakeInteraction(self, self.user(user_id), self.channel(channel_id))
+
+    def get_user(self, user_id: int):
+        return self.users.get(user_id) if self.cache_users else None
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def fetch_user(self, user_id: int):
+        self.fetches += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self.user(user_id)
+
+    async def fetch_channel(self, channel_id: int):
+        self.fetches += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self.channel(channel_id)
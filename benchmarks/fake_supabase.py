@@ -0,0 +1,264 @@
+# fake_supabase.py
+# In-memory stand-in for the subset of the Supabase REST API (PostgREST) the bot uses.
+# Supports eq/neq/lt/lte/gt/gte/in/is filters, or=(...) / and=(...) with nesting, order, limit,
+# select, Prefer: return=representation / resolution=merge-duplicates / count=exact, and the
+# increment_command_usage / reconcile_command_usage_totals / advance_reminders / mark_reminders_sent RPCs.
+
+import asyncio
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import parse_qsl
+from aiohttp import web
+
+TIMESTAMP_COLUMNS = {"reminder_time", "set_time", "next_occurrence", "lease_expires_at"}
+PRIMARY_KEYS = {
+    "reminders": "id",
+    "gifs": "name",
+    "user_preferences": "user_id",
+    "command_usage": ("user_id", "command_name"),
+    "command_usage_totals": "command_name",
+}
+OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+}
+
+def _timestamp(value: str) -> datetime:
+    value = value.strip().replace(" ", "T")
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    elif "T" in value and value[-3] in "+-":
+        value += ":00"  # "+00" -> "+00:00"
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+@lru_cache(maxsize=4096)
+def _coerce_as(column: str, raw: str, kind: type):
+    raw = raw[1:-1] if len(raw) >= 2 and raw[0] == raw[-1] == '"' else raw
+    if raw == "null":
+        return None
+    if column in TIMESTAMP_COLUMNS:
+        return _timestamp(raw)
+    if kind is bool:
+        return raw == "true"
+    if kind is int:
+        return int(raw)
+    return raw
+
+@lru_cache(maxsize=256)
+def _coerce_set(column: str, values: tuple, kind: type) -> frozenset:
+    return frozenset(_coerce_as(column, value, kind) for value in values)
+
+def _coerce(column: str, raw: str, sample):
+    # Turn a filter value into something comparable with the stored column value
+    return _coerce_as(column, raw, type(sample))
+
+def _column_value(row: dict, column: str):
+    value = row.get(column)
+    if column in TIMESTAMP_COLUMNS and isinstance(value, str):
+        return _timestamp(value)
+    return value
+
+def _split_top_level(text: str) -> list:
+    # "a.eq.1,and(b.eq.2,c.eq.3)" -> ["a.eq.1", "and(b.eq.2,c.eq.3)"], respecting quotes and parens
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part for part in parts if part]
+
+def _condition(column: str, expression: str):
+    operator, _, raw = expression.partition(".")
+    if operator == "in":
+        values = tuple(_split_top_level(raw[1:-1]))
+        return lambda row: _column_value(row, column) in _coerce_set(column, values, type(row.get(column)))
+    if operator == "is":
+        expected = None if raw == "null" else raw == "true"
+        return lambda row: row.get(column) is expected
+    compare = OPERATORS[operator]
+    return lambda row: compare(_column_value(row, column), _coerce(column, raw, row.get(column)))
+
+def _logical(expression: str):
+    # "column.op.value", "and(...)" or "or(...)" inside an or=(...) filter
+    for keyword, combine in (("and(", all), ("or(", any)):
+        if expression.startswith(keyword):
+            conditions = [_logical(part) for part in _split_top_level(expression[len(keyword):-1])]
+            return lambda row: combine(condition(row) for condition in conditions)
+    column, _, rest = expression.partition(".")
+    return _condition(column, rest)
+
+class FakeSupabase:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency  # Seconds added to every request, to simulate the network
+        self.tables = {table: [] for table in PRIMARY_KEYS}
+        self._next_id = {}
+        self.requests = 0
+        self.flushes = set()  # increment_command_usage flush ids already applied
+        self._runner = None
+        self.url = None
+
+    def seed(self, table: str, rows: list):
+        for row in rows:
+            self._insert(table, dict(row))
+
+    def _insert(self, table: str, row: dict) -> dict:
+        if PRIMARY_KEYS[table] == "id" and row.get("id") is None:
+            self._next_id[table] = self._next_id.get(table, 0) + 1
+            row["id"] = self._next_id[table]
+        elif PRIMARY_KEYS[table] == "id":
+            self._next_id[table] = max(self._next_id.get(table, 0), row["id"])
+        self.tables[table].append(row)
+        return row
+
+    def _key(self, table: str, row: dict):
+        key = PRIMARY_KEYS[table]
+        return tuple(row.get(k) for k in key) if isinstance(key, tuple) else row.get(key)
+
+    def _filter(self, table: str, params: list):
+        conditions, order, limit, select = [], [], None, None
+        for name, value in params:
+            if name == "order":
+                order = [part.split(".") for part in value.split(",")]
+            elif name == "limit":
+                limit = int(value)
+            elif name == "select":
+                select = value.split(",")
+            elif name == "on_conflict":
+                continue
+            elif name in ("or", "and"):
+                conditions.append(_logical(f"{name}{value}"))
+            else:
+                conditions.append(_condition(name, value))
+        rows = [row for row in self.tables[table] if all(condition(row) for condition in conditions)]
+        for column, *direction in reversed(order):
+            descending = direction[:1] == ["desc"]
+            rows.sort(key=lambda row: (_column_value(row, column) is None, _column_value(row, column)), reverse=descending)
+        return rows, limit, select
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.match_info["path"]
+        params = parse_qsl(request.query_string, keep_blank_values=True)
+        prefer = request.headers.get("Prefer", "")
+        if path.startswith("rpc/"):
+            return self._rpc(path[4:], await request.json())
+        table = path
+        if table not in self.tables:
+            return web.json_response({"message": f"relation {table} does not exist"}, status=404)
+
+        if request.method == "GET":
+            rows, limit, select = self._filter(table, params)
+            total = len(rows)
+            rows = rows[:limit] if limit is not None else rows
+            if select:
+                rows = [{column: row.get(column) for column in select} for row in rows]
+            headers = {"Content-Range": f"0-{max(len(rows) - 1, 0)}/{total if 'count=exact' in prefer else '*'}"}
+            return web.json_response(rows, headers=headers)
+
+        if request.method == "POST":
+            body = await request.json()
+            rows = body if isinstance(body, list) else [body]
+            written = []
+            index = {self._key(table, r): r for r in self.tables[table]}
+            for row in rows:
+                key = self._key(table, row)
+                existing = index.get(key) if key is not None else None
+                if existing is not None and "merge-duplicates" in prefer:
+                    existing.update(row)
+                    written.append(existing)
+                    continue
+                if existing is not None:
+                    return web.json_response({"message": "duplicate key value violates unique constraint"}, status=409)
+                written.append(self._insert(table, dict(row)))
+                index[self._key(table, written[-1])] = written[-1]
+            if "return=representation" in prefer:
+                return web.json_response(written, status=201)
+            return web.Response(status=201)
+
+        if request.method == "PATCH":
+            body = await request.json()
+            rows, _, _ = self._filter(table, params)
+            for row in rows:
+                row.update(body)
+            if "return=representation" in prefer:
+                return web.json_response(rows, status=200)
+            return web.Response(status=204)
+
+        if request.method == "DELETE":
+            rows, _, _ = self._filter(table, params)
+            doomed = {id(row) for row in rows}
+            self.tables[table] = [row for row in self.tables[table] if id(row) not in doomed]
+            if "return=representation" in prefer:
+                return web.json_response(rows, status=200)
+            return web.Response(status=204)
+        return web.Response(status=405)
+
+    def _rpc(self, name: str, body: dict) -> web.Response:
+        if name == "increment_command_usage":
+            if body.get("flush_id") in self.flushes:
+                return web.Response(status=204)
+            self.flushes.add(body.get("flush_id"))
+            for item in body["increments"]:
+                for table, key in (("command_usage", (item["user_id"], item["command_name"])), ("command_usage_totals", item["command_name"])):
+                    row = next((r for r in self.tables[table] if self._key(table, r) == key), None)
+                    if row is None:
+                        row = {"command_name": item["command_name"], "usage_count": 0}
+                        if table == "command_usage":
+                            row["user_id"] = item["user_id"]
+                        self.tables[table].append(row)
+                    row["usage_count"] += item["delta"]
+            return web.Response(status=204)
+        if name == "reconcile_command_usage_totals":
+            totals = {}
+            for row in self.tables["command_usage"]:
+                totals[row["command_name"]] = totals.get(row["command_name"], 0) + row["usage_count"]
+            self.tables["command_usage_totals"] = [
+                {"command_name": command_name, "usage_count": count} for command_name, count in totals.items()
+            ]
+            return web.json_response(self.tables["command_usage_totals"])
+        if name in ("advance_reminders", "mark_reminders_sent"):
+            items = {item["id"]: item for item in body["advances" if name == "advance_reminders" else "sent"]}
+            updated = []
+            for row in self.tables["reminders"]:
+                item = items.get(row["id"])
+                if (item is None or row.get("claimed_by") != body["worker_id"]
+                        or _column_value(row, "reminder_time") != _timestamp(item["reminder_time"])):
+                    continue
+                if name == "advance_reminders":
+                    row.update(reminder_time=item["next_time"], next_occurrence=item["next_time"], is_sent=False)
+                else:
+                    row.update(is_sent=True)
+                row.update(claimed_by=None, lease_expires_at=None)
+                updated.append(row)
+            return web.json_response(updated)
+        return web.json_response({"message": f"function {name} does not exist"}, status=404)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_route("*", "/{path:.+}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
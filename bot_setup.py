@@ -1,22 +1,110 @@
 # bot_setup.py
 # Bot initialization and startup logic
 
+import asyncio
+import logging
+import signal
+import time
 import discord
+from discord import app_commands
 from discord.ext import commands
-from config import BOT_TOKEN
-from reminders import check_for_reminders
+from config import BOT_TOKEN, OWNER_ID, METRICS_HOST, METRICS_PORT, SHUTDOWN_TIMEOUT_SECONDS
+from storage import storage
+import metrics
+from command_sync import sync_commands
+from embeds import CustomEmbed
+from ratelimit import RateLimited
+import log_setup
+from reminders import check_for_reminders, handle_snooze_interaction, drain_reminders
+from utility_commands import flush_command_usage, flush_usage, reconcile_stats
+
+logger = logging.getLogger(__name__)
+
+class JubJubTree(app_commands.CommandTree):
+    # Times every slash command: stamped before the handler runs, observed on completion or error
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started_at"] = time.perf_counter()
+        # Each interaction runs in its own task, so this tags only this command's log records
+        log_setup.bind(
+            command=interaction.command.qualified_name if interaction.command else None,
+            user_id=str(interaction.user.id), guild_id=interaction.guild_id
+        )
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(error, RateLimited):
+            # Rejected by a rate_limit check before the handler ran; just tell the user when to retry
+            if interaction.command is not None:
+                metrics.observe_command(interaction.command.qualified_name, interaction.extras.get("started_at"), "rate_limited")
+            embed = CustomEmbed.cooldown(f"JubJub needs a break! Wait {max(1, round(error.retry_after))} seconds before trying again.")
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        if interaction.command is not None:
+            metrics.observe_command(interaction.command.qualified_name, interaction.extras.get("started_at"), "error")
+        await super().on_error(interaction, error)
+
+class JubJubBot(commands.Bot):
+    # Set by `main.py --sync` to push the command tree even if its fingerprint is unchanged
+    force_sync = False
+
+    async def setup_hook(self):
+        # Open the storage backend (Supabase client or SQLite file) before anything talks to it
+        await storage.open()
+        # Runs once per process rather than on every (re)connect like on_ready
+        try:
+            await sync_commands(self.tree, force=self.force_sync)
+        except Exception:
+            logger.exception("Failed to sync commands")
+        flush_command_usage.start()
+        reconcile_stats.start()
+        if METRICS_PORT:
+            await metrics.start_server(METRICS_HOST, METRICS_PORT)
+        # SIGTERM (docker stop, systemd) shuts down as cleanly as Ctrl+C
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except (NotImplementedError, RuntimeError):
+            pass  # No signal handlers on Windows event loops
+
+    def _on_sigterm(self):
+        self._shutdown_task = asyncio.create_task(self.close())
+
+    async def invoke(self, ctx: commands.Context):
+        # Prefix commands ($remindme); errors are handled inside invoke, so it always returns
+        started_at = time.perf_counter()
+        await super().invoke(ctx)
+        if ctx.command is not None:
+            metrics.observe_command(f"${ctx.command.qualified_name}", started_at, "error" if ctx.command_failed else "ok")
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        metrics.observe_command(command.qualified_name, interaction.extras.get("started_at"), "ok")
+
+    async def close(self):
+        # Finish the reminder deliveries under way while Discord is still connected
+        await drain_reminders(SHUTDOWN_TIMEOUT_SECONDS)
+        # Write out whatever usage is still buffered before the HTTP client goes away. All of this
+        # happens before the gateway closes: that lets bot.run() return, and asyncio.run cancels
+        # whatever is still running, including a close() started from the SIGTERM handler.
+        flush_command_usage.cancel()
+        reconcile_stats.cancel()
+        await flush_usage()
+        await storage.close()
+        await metrics.stop_server()
+        await super().close()
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="$", intents=intents)
+bot = JubJubBot(command_prefix="$", intents=intents, tree_cls=JubJubTree, owner_id=OWNER_ID)
+
+# Snooze buttons on every reminder message, including ones sent before a restart
+bot.add_listener(handle_snooze_interaction, "on_interaction")
 
 @bot.event
 async def on_ready():
-    print(f"Logged in as {bot.user.name}")
-    try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} command(s)")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
-    check_for_reminders.start()
-    print("Bot is ready!")
\ No newline at end of file
+    # Fires again after every reconnect, so only start what isn't already running
+    logger.info("Logged in as %s", bot.user.name, extra={"bot_user_id": bot.user.id})
+    if not check_for_reminders.is_running():
+        check_for_reminders.start()
+    logger.info("Bot is ready!")
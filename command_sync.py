@@ -0,0 +1,39 @@
+# command_sync.py
+# Syncs the slash command tree with Discord only when its schema has changed
+
+import logging
+import hashlib
+import json
+from config import COMMAND_TREE_HASH_PATH
+
+logger = logging.getLogger(__name__)
+
+def tree_fingerprint(tree) -> str:
+    # Hash of the payload Discord would receive: names, descriptions, options, choices, permissions
+    payload = sorted((command.to_dict() for command in tree.get_commands()), key=lambda command: (command.get("type", 1), command["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def load_fingerprint(path: str = COMMAND_TREE_HASH_PATH):
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def save_fingerprint(fingerprint: str, path: str = COMMAND_TREE_HASH_PATH):
+    try:
+        with open(path, "w") as f:
+            f.write(fingerprint + "\n")
+    except OSError as e:
+        logger.warning("Failed to save command tree fingerprint to %s: %s", path, e)
+
+async def sync_commands(tree, force: bool = False):
+    # Returns the synced commands, or None if the tree is unchanged since the last sync
+    fingerprint = tree_fingerprint(tree)
+    if not force and load_fingerprint() == fingerprint:
+        logger.info("Command tree unchanged, skipping sync", extra={"fingerprint": fingerprint[:12]})
+        return None
+    synced = await tree.sync()
+    save_fingerprint(fingerprint)
+    logger.info("Synced %d command(s)", len(synced), extra={"fingerprint": fingerprint[:12]})
+    return synced
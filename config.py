@@ -2,6 +2,7 @@
 # Central place for all configuration settings
 
 import os
+import socket
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -11,12 +12,96 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 OWNER_ID = int(os.getenv("OWNER_ID"))  # Convert to int since it's an ID
-JUBJUB_BANNER = os.getenv("JUBJUB_BANNER")
-JUBJUB_PFP = os.getenv("JUBJUB_PFP")
+JUBJUB_BANNER = os.getenv("JUBJUB_BANNER", "https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+JUBJUB_PFP = os.getenv("JUBJUB_PFP", "https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
+
+# Where data is stored: "supabase" (default) or "sqlite" for a local database file
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "jubjub.db")
+
+# Hash of the last slash command tree synced to Discord; startup syncs again only when it changes
+COMMAND_TREE_HASH_PATH = os.getenv("COMMAND_TREE_HASH_PATH", ".command_tree_hash")
+
+# Logging: LOG_LEVEL for everything, LOG_LEVELS for per-module overrides ("reminders=DEBUG,discord=WARNING"),
+# LOG_FORMAT "json" (one object per line) or "text"; records beyond LOG_QUEUE_SIZE waiting to be written are dropped
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
 # Headers for Supabase requests
 SUPABASE_HEADERS = {
     "apikey": SUPABASE_KEY,
     "Authorization": f"Bearer {SUPABASE_KEY}",
     "Content-Type": "application/json",
-}
\ No newline at end of file
+}
+
+# Shared Supabase HTTP client (connection pool + timeouts, in seconds)
+SUPABASE_POOL_LIMIT = int(os.getenv("SUPABASE_POOL_LIMIT", "20"))
+SUPABASE_POOL_LIMIT_PER_HOST = int(os.getenv("SUPABASE_POOL_LIMIT_PER_HOST", "20"))
+SUPABASE_KEEPALIVE_TIMEOUT = float(os.getenv("SUPABASE_KEEPALIVE_TIMEOUT", "60"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "15"))
+
+# Supabase resilience: per-call timeouts, retries with jittered exponential backoff (seconds),
+# and a circuit breaker that fails fast after consecutive failures until the reset delay passes
+SUPABASE_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "5"))
+SUPABASE_WRITE_TIMEOUT = float(os.getenv("SUPABASE_WRITE_TIMEOUT", "10"))
+SUPABASE_RETRIES = int(os.getenv("SUPABASE_RETRIES", "3"))
+SUPABASE_RETRY_BASE_DELAY = float(os.getenv("SUPABASE_RETRY_BASE_DELAY", "0.2"))
+SUPABASE_RETRY_MAX_DELAY = float(os.getenv("SUPABASE_RETRY_MAX_DELAY", "2"))
+SUPABASE_BREAKER_THRESHOLD = int(os.getenv("SUPABASE_BREAKER_THRESHOLD", "5"))
+SUPABASE_BREAKER_RESET_SECONDS = float(os.getenv("SUPABASE_BREAKER_RESET_SECONDS", "30"))
+
+# Reminder scheduler: reminders due within the lookahead are held in memory and fired on time,
+# the reconciliation pass re-syncs that window with Supabase (keep lookahead > interval)
+SCHEDULER_LOOKAHEAD_SECONDS = int(os.getenv("SCHEDULER_LOOKAHEAD_SECONDS", "600"))
+SCHEDULER_RECONCILE_SECONDS = int(os.getenv("SCHEDULER_RECONCILE_SECONDS", "300"))
+
+# Identity of this bot process when several share one database, and how long its claim on due
+# reminders lasts before another process may take them over (must outlast a delivery tick)
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+REMINDER_LEASE_SECONDS = int(os.getenv("REMINDER_LEASE_SECONDS", "120"))
+
+# Users/channels fetched over REST for delivery are cached this long (seconds), up to this many each
+RESOLVER_CACHE_TTL_SECONDS = int(os.getenv("RESOLVER_CACHE_TTL_SECONDS", "900"))
+RESOLVER_CACHE_SIZE = int(os.getenv("RESOLVER_CACHE_SIZE", "5000"))
+
+# Overdue reminders (after downtime) are delivered in pages of this many
+CATCHUP_PAGE_SIZE = int(os.getenv("CATCHUP_PAGE_SIZE", "200"))
+# On shutdown, how long to wait for reminder deliveries already under way to finish (seconds)
+SHUTDOWN_TIMEOUT_SECONDS = int(os.getenv("SHUTDOWN_TIMEOUT_SECONDS", "20"))
+
+# Users whose active reminders are indexed in memory for cancel/snooze by id
+REMINDER_INDEX_USERS = int(os.getenv("REMINDER_INDEX_USERS", "10000"))
+
+# Most token buckets each rate limiter keeps; idle ones are evicted long before this
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+
+# Number of concurrent delivery workers (each Discord channel/user route still runs one send at a time)
+DELIVERY_WORKERS = int(os.getenv("DELIVERY_WORKERS", "8"))
+
+# Max reminders per bulk state write (ids per PATCH id=in.(...) / rows per upsert)
+STATE_FLUSH_CHUNK = int(os.getenv("STATE_FLUSH_CHUNK", "500"))
+
+# How often buffered command usage counters are written to Supabase
+USAGE_FLUSH_SECONDS = int(os.getenv("USAGE_FLUSH_SECONDS", "30"))
+
+# How long the in-memory GIF catalog is served before it refreshes in the background
+GIF_CACHE_TTL_SECONDS = int(os.getenv("GIF_CACHE_TTL_SECONDS", "300"))
+
+# User preference cache (rows are cached for the TTL, missing rows for the shorter negative TTL)
+PREFERENCES_CACHE_TTL_SECONDS = int(os.getenv("PREFERENCES_CACHE_TTL_SECONDS", "3600"))
+PREFERENCES_NEGATIVE_TTL_SECONDS = int(os.getenv("PREFERENCES_NEGATIVE_TTL_SECONDS", "600"))
+PREFERENCES_CACHE_SIZE = int(os.getenv("PREFERENCES_CACHE_SIZE", "10000"))
+
+# /stats rollups: how often totals are re-synced with Supabase, and how many users' breakdowns to keep
+STATS_RECONCILE_SECONDS = int(os.getenv("STATS_RECONCILE_SECONDS", "3600"))
+STATS_USER_CACHE_SIZE = int(os.getenv("STATS_USER_CACHE_SIZE", "5000"))
+
+# Reminders shown per page in /checkreminders
+REMINDER_PAGE_SIZE = int(os.getenv("REMINDER_PAGE_SIZE", "10"))
+
+# Prometheus metrics endpoint (GET /metrics); disabled unless METRICS_PORT is set
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
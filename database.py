@@ -1,42 +1,217 @@
 # database.py
 # Supabase API interaction helpers
 
+import logging
+import asyncio
+import random
+import time
 import aiohttp
-from config import SUPABASE_URL, SUPABASE_HEADERS
-from urllib.parse import quote
-from datetime import datetime, timezone  # Add this line
-
-async def fetch_data(endpoint: str, filters: str = ""):
-    async with aiohttp.ClientSession() as session:
-        url = f"{SUPABASE_URL}/{endpoint}{filters}"
-        async with session.get(url, headers=SUPABASE_HEADERS) as response:
-            if response.status == 200:
-                return await response.json()
-            print(f"Failed to fetch {endpoint}: {response.status}")
-            return []
-
-async def post_data(endpoint: str, data: dict):
-    async with aiohttp.ClientSession() as session:
-        url = f"{SUPABASE_URL}/{endpoint}"
-        async with session.post(url, headers=SUPABASE_HEADERS, json=data) as response:
-            return response.status, await response.text()
-
-async def patch_data(endpoint: str, filters: str, data: dict):
-    async with aiohttp.ClientSession() as session:
-        url = f"{SUPABASE_URL}/{endpoint}?{filters}"
-        async with session.patch(url, headers=SUPABASE_HEADERS, json=data) as response:
-            return response.status, await response.text()
-
-async def fetch_gifs():
-    return await fetch_data("gifs", "?select=name,link,category")
-
-async def fetch_reminders(user_id: str, active_only: bool = True):
-    is_sent_filter = "is_sent=eq.false" if active_only else "is_sent=eq.true"
-    filters = f"?user_id=eq.{user_id}&{is_sent_filter}&order=reminder_time.asc"
-    return await fetch_data("reminders", filters)
-
-async def fetch_due_reminders():
-    current_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S+00")
-    encoded_time = quote(current_time)
-    filters = f"?is_sent=eq.false&reminder_time=lt.{encoded_time}"
-    return await fetch_data("reminders", filters)
\ No newline at end of file
+from json import loads as json_loads
+from metrics import STORAGE_LATENCY
+from single_flight import SingleFlight
+from config import (
+    SUPABASE_URL, SUPABASE_HEADERS, SUPABASE_POOL_LIMIT, SUPABASE_POOL_LIMIT_PER_HOST,
+    SUPABASE_KEEPALIVE_TIMEOUT, SUPABASE_CONNECT_TIMEOUT, SUPABASE_TIMEOUT,
+    SUPABASE_READ_TIMEOUT, SUPABASE_WRITE_TIMEOUT, SUPABASE_RETRIES, SUPABASE_RETRY_BASE_DELAY,
+    SUPABASE_RETRY_MAX_DELAY, SUPABASE_BREAKER_THRESHOLD, SUPABASE_BREAKER_RESET_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# One long-lived session for the whole bot so connections are kept alive and reused
+_session = None
+
+async def open_session():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=SUPABASE_POOL_LIMIT,
+            limit_per_host=SUPABASE_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=SUPABASE_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(total=SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=SUPABASE_HEADERS)
+    return _session
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+async def get_session():
+    # Normally opened in setup_hook, but open lazily if something runs before that
+    if _session is None or _session.closed:
+        return await open_session()
+    return _session
+
+class CircuitOpenError(aiohttp.ClientError):
+    # Raised instead of calling Supabase while the breaker is open. A ClientError subclass so
+    # callers (and tasks.loop's reconnect logic) treat it like any other connection failure.
+    pass
+
+class CircuitBreaker:
+    # Opens after `threshold` consecutive failures and fails fast for `reset_seconds`, then
+    # lets a single probe request through (half-open): success closes it, failure re-opens it.
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half-open"
+
+    def before_request(self) -> bool:
+        # -> True when this request is the half-open probe
+        state = self.state
+        if state == "open" or (state == "half-open" and self._probing):
+            raise CircuitOpenError(f"Supabase circuit open after {self.failures} consecutive failures")
+        if state == "half-open":
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("Supabase circuit closed, requests are going through again")
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_cancelled(self, probe: bool):
+        # A cancelled probe proves nothing either way; let the next request probe instead
+        if probe:
+            self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning("Supabase circuit opened after %d consecutive failures", self.failures)
+            self.opened_at = time.monotonic()
+
+breaker = CircuitBreaker(SUPABASE_BREAKER_THRESHOLD, SUPABASE_BREAKER_RESET_SECONDS)
+
+def _backoff(attempt: int, retry_after: str = None) -> float:
+    # Full jitter: uniform in [0, base * 2^attempt], capped; honour a numeric Retry-After on 429s
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), SUPABASE_RETRY_MAX_DELAY)
+    return random.uniform(0, min(SUPABASE_RETRY_MAX_DELAY, SUPABASE_RETRY_BASE_DELAY * 2 ** attempt))
+
+async def request(method: str, url: str, *, json=None, headers: dict = None, timeout: float = None,
+                  idempotent: bool = True):
+    # Every Supabase call goes through here -> (status, text, response headers).
+    # Idempotent requests are retried on timeouts, connection errors, 429 and 5xx; others only
+    # when the connection was never made, so an insert can't be applied twice.
+    session = await get_session()
+    client_timeout = aiohttp.ClientTimeout(total=timeout or SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+    endpoint = url[len(SUPABASE_URL) + 1:].split("?", 1)[0]
+    attempt = 0
+    while True:
+        probe = breaker.before_request()
+        started_at = time.perf_counter()
+        try:
+            async with session.request(method, url, json=json, headers=headers, timeout=client_timeout) as response:
+                text = await response.text()
+                status, response_headers = response.status, response.headers
+        except asyncio.CancelledError:
+            breaker.record_cancelled(probe)
+            raise
+        except aiohttp.ClientConnectorError:
+            STORAGE_LATENCY.observe(time.perf_counter() - started_at, method=method, endpoint=endpoint, status="connect_error")
+            breaker.record_failure()
+            if attempt >= SUPABASE_RETRIES:
+                raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            STORAGE_LATENCY.observe(time.perf_counter() - started_at, method=method, endpoint=endpoint, status=status)
+            breaker.record_failure()
+            if not idempotent or attempt >= SUPABASE_RETRIES:
+                raise
+        else:
+            STORAGE_LATENCY.observe(time.perf_counter() - started_at, method=method, endpoint=endpoint, status=status)
+            if status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if not ((status == 429 or status >= 500) and idempotent and attempt < SUPABASE_RETRIES):
+                return status, text, response_headers
+            await asyncio.sleep(_backoff(attempt, response_headers.get("Retry-After")))
+            attempt += 1
+            continue
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+# Identical GETs in flight at the same time share one request
+_inflight = SingleFlight()
+
+async def _coalesced_get(key, url: str, headers: dict = None, timeout: float = None):
+    return await _inflight.run(key, request, "GET", url, headers=headers, timeout=timeout or SUPABASE_READ_TIMEOUT)
+
+async def fetch_data(endpoint: str, filters: str = "", timeout: float = None):
+    url = f"{SUPABASE_URL}/{endpoint}{filters}"
+    status, text, _ = await _coalesced_get(url, url, timeout=timeout)
+    if status == 200:
+        return json_loads(text)
+    logger.error("Failed to fetch %s", endpoint, extra={"endpoint": endpoint, "status": status})
+    return []
+
+async def fetch_page(endpoint: str, filters: str = "", count: bool = False, timeout: float = None):
+    # Like fetch_data, but can also ask PostgREST for the exact total row count -> (rows, total)
+    url = f"{SUPABASE_URL}/{endpoint}{filters}"
+    headers = {"Prefer": "count=exact"} if count else None
+    status, text, response_headers = await _coalesced_get((url, count), url, headers, timeout)
+    if status not in (200, 206):
+        logger.error("Failed to fetch %s", endpoint, extra={"endpoint": endpoint, "status": status})
+        return [], 0 if count else None
+    rows = json_loads(text)
+    total = None
+    if count:
+        content_range = response_headers.get("Content-Range", "")
+        total = int(content_range.split("/")[-1]) if content_range.split("/")[-1].isdigit() else len(rows)
+    return rows, total
+
+async def post_data(endpoint: str, data: dict, returning: bool = False, idempotent: bool = False, timeout: float = None):
+    # Inserts and RPCs aren't safe to repeat unless the caller says so
+    url = f"{SUPABASE_URL}/{endpoint}"
+    headers = {"Prefer": "return=representation"} if returning else None
+    status, text, _ = await request(
+        "POST", url, json=data, headers=headers, timeout=timeout or SUPABASE_WRITE_TIMEOUT, idempotent=idempotent
+    )
+    return status, text
+
+async def patch_data(endpoint: str, filters: str, data: dict, returning: bool = False, idempotent: bool = True,
+                     timeout: float = None):
+    # Conditional writes (filters on the values being changed) aren't safe to repeat: a retry of
+    # one the server already applied matches nothing, so callers pass idempotent=False
+    url = f"{SUPABASE_URL}/{endpoint}?{filters}"
+    headers = {"Prefer": "return=representation"} if returning else None
+    status, text, _ = await request(
+        "PATCH", url, json=data, headers=headers, timeout=timeout or SUPABASE_WRITE_TIMEOUT, idempotent=idempotent
+    )
+    return status, text
+
+async def upsert_data(endpoint: str, rows: list, timeout: float = None):
+    # Bulk insert-or-update on the primary key in a single request (safe to retry)
+    url = f"{SUPABASE_URL}/{endpoint}"
+    headers = {"Prefer": "resolution=merge-duplicates,return=minimal"}
+    status, text, _ = await request("POST", url, json=rows, headers=headers, timeout=timeout or SUPABASE_WRITE_TIMEOUT)
+    return status, text
+
+async def delete_data(endpoint: str, filters: str, returning: bool = False, idempotent: bool = True,
+                      timeout: float = None):
+    url = f"{SUPABASE_URL}/{endpoint}?{filters}"
+    headers = {"Prefer": "return=representation"} if returning else None
+    status, text, _ = await request(
+        "DELETE", url, headers=headers, timeout=timeout or SUPABASE_WRITE_TIMEOUT, idempotent=idempotent
+    )
+    return status, text
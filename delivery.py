@@ -0,0 +1,101 @@
+# delivery.py
+# Bounded-concurrency delivery pipeline with one queue per Discord route
+
+import asyncio
+import time
+from collections import deque
+from metrics import DELIVERY_LAG, DELIVERY_JOBS
+
+class DeliveryPipeline:
+    # Jobs are zero-argument coroutine factories grouped by a route key such as
+    # ("channel", channel_id) or ("user", user_id). Each route runs one job at a time so
+    # we never pile onto a single Discord rate-limit bucket, while different routes are
+    # worked in parallel by a fixed pool of workers. A failing job only fails its own future.
+    def __init__(self, workers: int = 8):
+        self.workers = workers
+        self._routes = {}  # route key -> deque of (job, future, due_ts)
+        self._ready = asyncio.Queue()  # Route keys with pending jobs and no job running
+        self._tasks = []
+        # Counters
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+        self._lag_count = 0
+
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        if not self.is_running():
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def submit(self, route, job, due_ts: float = None) -> asyncio.Future:
+        # due_ts is the reminder's scheduled time, used to measure delivery lag
+        future = asyncio.get_running_loop().create_future()
+        queue = self._routes.get(route)
+        if queue is None:
+            queue = self._routes[route] = deque()
+            self._ready.put_nowait(route)
+        queue.append((job, future, due_ts))
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        return future
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "routes": len(self._routes),
+            "completed": self.completed,
+            "failed": self.failed,
+            "last_lag": round(self.last_lag, 3),
+            "max_lag": round(self.max_lag, 3),
+            "avg_lag": round(self._lag_total / self._lag_count, 3) if self._lag_count else 0.0,
+        }
+
+    def _record_lag(self, due_ts: float):
+        lag = max(time.time() - due_ts, 0.0)
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._lag_total += lag
+        self._lag_count += 1
+        DELIVERY_LAG.observe(lag)
+
+    async def _worker(self):
+        while True:
+            route = await self._ready.get()
+            queue = self._routes[route]
+            job, future, due_ts = queue.popleft()
+            self.queue_depth -= 1
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.failed += 1
+                DELIVERY_JOBS.inc(status="failed")
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.completed += 1
+                DELIVERY_JOBS.inc(status="completed")
+                if due_ts is not None:
+                    self._record_lag(due_ts)
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                # Round-robin: put the route at the back so busy routes can't starve others
+                if queue:
+                    self._ready.put_nowait(route)
+                else:
+                    del self._routes[route]
@@ -2,65 +2,142 @@
 # Custom embed handler for consistent styling
 
 import discord
-from config import JUBJUB_BANNER
+from config import JUBJUB_BANNER, JUBJUB_PFP
 from datetime import datetime
 
+# JubJub's colors
+JUBJUB_RED = discord.Color.from_rgb(255, 0, 0)  # Red like JubJub's eyes
+JUBJUB_YELLOW = discord.Color.from_rgb(255, 255, 0)  # Yellow like JubJub's pupils
+JUBJUB_WHITE = discord.Color.from_rgb(255, 255, 255)  # White for JubJub's hair
+
+_new_embed = discord.Embed.__new__
+
 class CustomEmbed:
+    # Branded skeletons are built once (see build_templates) and every response is a shallow
+    # copy of one, filled with its own text. The thumbnail/footer/image dicts are shared between
+    # copies; that's safe because discord.Embed's setters replace them rather than mutating
+    # them, and templates never carry fields that add_field could append to.
+    _templates = {}  # name -> ((slot, value), ...) snapshot of the skeleton embed
+
+    @classmethod
+    def register(cls, name: str, title: str = None, color: discord.Color = None, footer: str = None,
+                 description: str = None, branded: bool = True):
+        # branded adds JubJub's thumbnail and footer icon on top of the banner every embed gets
+        embed = discord.Embed(title=title, description=description, color=color)
+        if branded:
+            embed.set_thumbnail(url=JUBJUB_PFP)
+            embed.set_footer(text=footer, icon_url=JUBJUB_PFP)
+        elif footer:
+            embed.set_footer(text=footer)
+        embed.set_image(url=JUBJUB_BANNER)
+        cls._templates[name] = tuple(
+            (slot, getattr(embed, slot)) for slot in discord.Embed.__slots__ if hasattr(embed, slot)
+        )
+
+    @classmethod
+    def build_templates(cls):
+        cls.register("banner", branded=False)
+        cls.register("reminder", title="⏰ Reminder!", color=discord.Color.green(), footer="JubJub", branded=False)
+        cls.register("not_found", title="❌ Reminder Not Found", color=JUBJUB_RED, footer="JubJub’s confused!")
+        cls.register("invalid", color=JUBJUB_RED, footer="JubJub’s confused!")
+        cls.register("failure", color=JUBJUB_RED, footer="JubJub’s sorry!")
+        cls.register("snoozed", title="💤 Reminder Snoozed!", color=JUBJUB_YELLOW, footer="JubJub’s snoozing!")
+        cls.register("canceled", title="🗑️ Reminder Canceled!", color=JUBJUB_RED, footer="JubJub’s got it!")
+        cls.register("cooldown", title="⏳ Slow Down, Chaos Gremlin!", color=JUBJUB_RED, footer="JubJub’s cooling off!")
+        cls.register("stats", title="📊 JubJub’s Stats!", color=JUBJUB_WHITE, footer="JubJub’s keeping score!",
+                     description="Check out how much action I’ve been getting! 🖤🤍❤️💛")
+        cls.register("pong", title="🏓 Pong!", color=JUBJUB_RED, footer="JubJub’s got your back!",
+                     description="Here’s how fast I’m vibing!")
+        cls.register("roast", title="🔥 JubJub’s Roast Time!", color=JUBJUB_RED, footer="JubJub’s roasting time!")
+
+    @classmethod
+    def from_template(cls, name: str, description: str = None, title: str = None, **attrs):
+        embed = _new_embed(discord.Embed)
+        for slot, value in cls._templates[name]:
+            setattr(embed, slot, value)
+        if title is not None:
+            embed.title = title
+        if description is not None:
+            embed.description = description
+        if attrs:
+            for attr, value in attrs.items():
+                setattr(embed, attr, value)
+        return embed
+
+    @staticmethod
+    def not_found(description: str, title: str = None):
+        return CustomEmbed.from_template("not_found", description, title and f"❌ {title}")
+
+    @staticmethod
+    def invalid(title: str, description: str):
+        return CustomEmbed.from_template("invalid", description, f"❌ {title}")
+
+    @staticmethod
+    def failure(title: str, description: str):
+        return CustomEmbed.from_template("failure", description, f"❌ {title}")
+
+    @staticmethod
+    def snoozed(description: str):
+        return CustomEmbed.from_template("snoozed", description)
+
+    @staticmethod
+    def canceled(description: str):
+        return CustomEmbed.from_template("canceled", description)
+
+    @staticmethod
+    def cooldown(description: str):
+        return CustomEmbed.from_template("cooldown", description)
+
+    @staticmethod
+    def stats():
+        return CustomEmbed.from_template("stats")
+
+    @staticmethod
+    def pong():
+        return CustomEmbed.from_template("pong")
+
+    @staticmethod
+    def roast(description: str):
+        return CustomEmbed.from_template("roast", description)
+
     @staticmethod
     def success(title: str, description: str, timestamp: datetime = None, user=None):
-        embed = discord.Embed(
-            title=title,
-            description=description,
-            color=discord.Color.green(),
-            timestamp=timestamp
-        )
+        embed = CustomEmbed.from_template("banner", description, title, color=discord.Color.green(), timestamp=timestamp)
         if user:
             embed.set_author(name=user.name, icon_url=user.avatar.url)
             embed.set_footer(text=f"Set by {user.name}")
-        embed.set_image(url=JUBJUB_BANNER)
         return embed
 
     @staticmethod
     def error(title: str, description: str):
-        embed = discord.Embed(
-            title=f"❌ {title}",
-            description=description,
-            color=discord.Color.red()
-        )
-        embed.set_image(url=JUBJUB_BANNER)
-        return embed
+        return CustomEmbed.from_template("banner", description, f"❌ {title}", color=discord.Color.red())
 
     @staticmethod
-    def reminder(user, message: str, reminder_time: datetime, set_time: datetime, channel, recurrence: str, recurrence_time: str = None):
-        embed = discord.Embed(
-            title="⏰ Reminder!",
-            description=message,
-            color=discord.Color.green(),
-            timestamp=reminder_time
-        )
+    def reminder(user, message: str, reminder_time: datetime, set_time: datetime, channel, recurrence: str, recurrence_time: str = None, missed: int = 0):
+        embed = CustomEmbed.from_template("reminder", message, timestamp=reminder_time)
         embed.set_author(name=user.name, icon_url=user.avatar.url)
-        embed.set_footer(text="JubJub")
         embed.set_thumbnail(url=user.avatar.url)
-        embed.set_image(url=JUBJUB_BANNER)
         embed.add_field(name="Set On", value=set_time.strftime("%Y-%m-%d %H:%M:%S UTC"), inline=False)
         embed.add_field(name="Channel", value=channel.mention, inline=False)
         if recurrence != "none":
             embed.add_field(name="Recurrence", value=f"{recurrence} at {recurrence_time}", inline=False)
+        if missed > 1:
+            embed.add_field(name="Missed", value=f"This came due {missed} times while JubJub was away, here it is once.", inline=False)
         return embed
 
     @staticmethod
-    def reminder_list(reminders, active_only: bool, start_index: int = 0, max_per_page: int = 10):
-        embed = discord.Embed(
+    def reminder_list(reminders, active_only: bool, start_index: int = 0, total: int = None):
+        # reminders is the page being shown; start_index is its offset within all total reminders
+        embed = CustomEmbed.from_template(
+            "banner",
             title="Your Active Reminders" if active_only else "Your Archived Reminders",
             color=discord.Color.green() if active_only else discord.Color.greyple()
         )
-        embed.set_image(url=JUBJUB_BANNER)
         
         if not reminders:
             embed.description = "You have no active reminders." if active_only else "You have no archived reminders."
         else:
-            end_index = min(start_index + max_per_page, len(reminders))
-            for reminder in reminders[start_index:end_index]:
+            for reminder in reminders:
                 reminder_time = datetime.fromisoformat(reminder["reminder_time"])
                 set_time = datetime.fromisoformat(reminder["set_time"])
                 value = (
@@ -71,5 +148,8 @@ class CustomEmbed:
                     f"**Recurrence**: {reminder['recurrence'] if reminder['recurrence'] != 'none' else 'None'}"
                 )
                 embed.add_field(name=f"Reminder (ID: {reminder['id']})", value=value, inline=False)
-            embed.set_footer(text=f"Showing {start_index + 1}-{end_index} of {len(reminders)} reminders")
-        return embed
\ No newline at end of file
+            total = len(reminders) if total is None else total
+            embed.set_footer(text=f"Showing {start_index + 1}-{start_index + len(reminders)} of {total} reminders")
+        return embed
+
+CustomEmbed.build_templates()
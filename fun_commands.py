@@ -4,7 +4,9 @@
 import discord
 from discord import app_commands
 import random
+from embeds import CustomEmbed
 from utility_commands import track_command_usage
+from ratelimit import rate_limit
 
 # List of lighthearted roasts (safe and fun)
 ROASTS = [
@@ -20,50 +22,19 @@ ROASTS = [
     "{user}, your chaos level is so low, JubJub’s yellow pupils are judging you!"
 ]
 
-# Cooldown tracking (in-memory for now, could move to Supabase later)
-roast_cooldowns = {}
-
 @app_commands.command(name="roast", description="Let JubJub roast someone (or yourself)!")
 @app_commands.describe(user="Who to roast (leave blank to roast yourself)")
+@rate_limit(1, 300)  # One roast per user every 5 minutes
 async def roast(interaction: discord.Interaction, user: discord.User = None):
     await track_command_usage(str(interaction.user.id), "roast")
 
     # If no user is specified, roast the caller
     target = user if user else interaction.user
 
-    # Check cooldown (5 minutes per user)
-    user_id = str(interaction.user.id)
-    current_time = discord.utils.utcnow().timestamp()
-    if user_id in roast_cooldowns:
-        last_used = roast_cooldowns[user_id]
-        cooldown_seconds = 300  # 5 minutes
-        time_left = cooldown_seconds - (current_time - last_used)
-        if time_left > 0:
-            embed = discord.Embed(
-                title="⏳ Slow Down, Chaos Gremlin!",
-                description=f"JubJub needs a break! Wait {int(time_left)} seconds before roasting again.",
-                color=discord.Color.from_rgb(255, 0, 0)  # Red like JubJub's eyes
-            )
-            embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-            embed.set_footer(text="JubJub’s cooling off!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-            embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-
-    # Update cooldown
-    roast_cooldowns[user_id] = current_time
-
     # Pick a random roast and format it
     roast_text = random.choice(ROASTS).format(user=f"<@{target.id}>")
 
     # Create the embed
-    embed = discord.Embed(
-        title="🔥 JubJub’s Roast Time!",
-        description=roast_text,
-        color=discord.Color.from_rgb(255, 0, 0)  # Red like JubJub's eyes
-    )
-    embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-    embed.set_footer(text="JubJub’s roasting time!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-    embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+    embed = CustomEmbed.roast(roast_text)
 
     await interaction.response.send_message(embed=embed)
\ No newline at end of file
@@ -0,0 +1,131 @@
+# gif_catalog.py
+# In-process GIF catalog cache with exact, prefix and trigram lookups
+
+import logging
+import asyncio
+import time
+from bisect import bisect_left
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+MAX_CHOICES = 25  # Discord's limit for autocomplete results
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class GifCatalog:
+    # Keeps the whole gifs table in memory. Lookups never wait on the network once the
+    # catalog has loaded: an expired catalog keeps serving while it refreshes in the background.
+    def __init__(self, loader, ttl_seconds: float):
+        self._loader = loader  # async () -> list of gif rows
+        self.ttl_seconds = ttl_seconds
+        self._by_name = {}  # lowercased name -> gif row
+        self._sorted_names = []  # lowercased names, sorted for prefix search
+        self._trigrams = {}  # trigram -> set of lowercased names
+        self._loaded_at = None
+        self._refresh_task = None
+        self._lock = asyncio.Lock()
+        self._added = None  # GIFs add()ed while a refresh is loading, which its result may predate
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def _index(self, gifs: list):
+        by_name, trigrams = {}, {}
+        for gif in gifs:
+            key = gif["name"].lower()
+            by_name[key] = gif
+            for trigram in _trigrams(key):
+                trigrams.setdefault(trigram, set()).add(key)
+        self._by_name = by_name
+        self._sorted_names = sorted(by_name)
+        self._trigrams = trigrams
+
+    async def refresh(self):
+        async with self._lock:
+            self._added = {}
+            try:
+                gifs = await self._loader()
+            except Exception as e:
+                logger.warning("Failed to refresh GIF catalog: %s", e)
+                return
+            finally:
+                added, self._added = self._added, None
+            if not gifs and self._by_name:
+                return  # A failed fetch comes back empty, keep serving what we have
+            loaded = {gif["name"].lower() for gif in gifs}
+            self._index(gifs + [gif for key, gif in added.items() if key not in loaded])
+            self._loaded_at = time.monotonic()
+
+    async def _ensure_loaded(self):
+        if self._loaded_at is None:
+            await self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl_seconds:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self.refresh())
+
+    def add(self, gif: dict):
+        # Make a freshly added GIF visible immediately without waiting for a refresh
+        key = gif["name"].lower()
+        if key not in self._by_name:
+            self._sorted_names.insert(bisect_left(self._sorted_names, key), key)
+            for trigram in _trigrams(key):
+                self._trigrams.setdefault(trigram, set()).add(key)
+        self._by_name[key] = gif
+        if self._added is not None:
+            self._added[key] = gif
+
+    async def get(self, name: str):
+        await self._ensure_loaded()
+        return self._by_name.get(name.lower())
+
+    async def search(self, query: str, limit: int = MAX_CHOICES) -> list:
+        # Returns GIF rows ranked exact > prefix > substring > fuzzy (shared trigrams)
+        await self._ensure_loaded()
+        query = query.strip().lower()
+        if not query:
+            return [self._by_name[key] for key in self._sorted_names[:limit]]
+
+        ranked = []
+        seen = set()
+
+        def take(keys):
+            for key in keys:
+                if key not in seen:
+                    seen.add(key)
+                    ranked.append(key)
+                    if len(ranked) >= limit:
+                        return True
+            return False
+
+        if query in self._by_name and take([query]):
+            return [self._by_name[key] for key in ranked]
+
+        start = bisect_left(self._sorted_names, query)
+        prefix = []
+        for key in islice(self._sorted_names, start, None):
+            if not key.startswith(query) or len(prefix) >= limit:
+                break
+            prefix.append(key)
+        if take(prefix):
+            return [self._by_name[key] for key in ranked]
+
+        if len(query) < 3:
+            # Too short for trigrams to be selective, a scan of the names is cheap enough
+            take(key for key in self._sorted_names if query in key)
+            return [self._by_name[key] for key in ranked]
+
+        query_trigrams = _trigrams(query)
+        shared = {}
+        for trigram in query_trigrams:
+            for key in self._trigrams.get(trigram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        substring = sorted(key for key in shared if query in key)
+        if take(substring):
+            return [self._by_name[key] for key in ranked]
+        threshold = len(query_trigrams) * 0.4
+        fuzzy = sorted((key for key, count in shared.items() if count >= threshold), key=lambda k: (-shared[k], k))
+        take(fuzzy)
+        return [self._by_name[key] for key in ranked]
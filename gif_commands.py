@@ -3,37 +3,47 @@
 
 import discord
 from discord import app_commands
-from database import fetch_gifs
-from config import OWNER_ID
+from storage import storage
+from config import OWNER_ID, GIF_CACHE_TTL_SECONDS
 from utility_commands import track_command_usage
+from gif_catalog import GifCatalog
+from ratelimit import rate_limit, autocomplete_limiter
+
+# Whole gifs table kept in memory so lookups and autocomplete skip the network
+gif_catalog = GifCatalog(storage.fetch_gifs, GIF_CACHE_TTL_SECONDS)
+# Autocomplete fires on every keystroke; past this, users just get no suggestions for a moment
+gif_search_limiter = autocomplete_limiter(10, 5)
 
 @app_commands.command(name="gif", description="Send a GIF")
 @app_commands.describe(gif_name="The name of the GIF to send")
+@rate_limit(10, 30)
+@rate_limit(60, 60, scope="guild")
 async def send_gif(interaction: discord.Interaction, gif_name: str):
     await track_command_usage(str(interaction.user.id), "gif")
-    gifs = await fetch_gifs()
-    gif_link = next((g["link"] for g in gifs if g["name"].lower() == gif_name.lower()), None)
-    if gif_link:
-        await interaction.response.send_message(gif_link)
+    gif = await gif_catalog.get(gif_name)
+    if gif:
+        await interaction.response.send_message(gif["link"])
     else:
         await interaction.response.send_message("GIF not found!", ephemeral=True)
 
 @send_gif.autocomplete("gif_name")
 async def gif_autocomplete(interaction: discord.Interaction, current: str):
-    gifs = await fetch_gifs()
-    choices = [app_commands.Choice(name=gif["name"], value=gif["name"]) for gif in gifs]
-    return [choice for choice in choices if current.lower() in choice.name.lower()]
+    if gif_search_limiter.hit(interaction.user.id):
+        return []
+    gifs = await gif_catalog.search(current)
+    return [app_commands.Choice(name=gif["name"], value=gif["name"]) for gif in gifs]
 
 @app_commands.command(name="gif_add", description="Add a new GIF (Owner only)")
 @app_commands.describe(name="GIF name", link="GIF URL", category="GIF category")
+@rate_limit(10, 60)
 async def gif_add(interaction: discord.Interaction, name: str, link: str, category: str = "general"):
     await track_command_usage(str(interaction.user.id), "gif_add")
-    from database import post_data
     if interaction.user.id != OWNER_ID:
         await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
         return
-    status, _ = await post_data("gifs", {"name": name, "link": link, "category": category})
-    if status == 201:
+    gif = {"name": name, "link": link, "category": category}
+    if await storage.add_gif(gif):
+        gif_catalog.add(gif)
         await interaction.response.send_message(f"GIF '{name}' added successfully!", ephemeral=True)
     else:
-        await interaction.response.send_message(f"Failed to add GIF: {status}", ephemeral=True)
\ No newline at end of file
+        await interaction.response.send_message(f"Failed to add GIF '{name}'.", ephemeral=True)
\ No newline at end of file
@@ -1,14 +1,19 @@
 # main.py
 # Entry point for the bot
 
+import argparse
 import discord
+from discord.ext import commands
 from bot_setup import bot
-from reminders import remind_me_logic, check_reminders_logic, remind_me_slash, remind_loop_slash, check_reminders_slash, cancel_reminder, snooze_reminder
+from reminders import remind_me_logic, check_reminders_logic, remind_me_slash, remind_loop_slash, check_reminders_slash, cancel_reminder, snooze_reminder, delivery_mode_slash
 from gif_commands import send_gif, gif_add
 from utility_commands import ping, stats
 from fun_commands import roast  # Add this
-import re
 from embeds import CustomEmbed
+from preferences import get_user_preferences
+from time_parser import parse_reminder_input
+from command_sync import sync_commands
+from log_setup import setup_logging
 from config import BOT_TOKEN
 
 # Register slash commands
@@ -21,44 +26,42 @@ bot.tree.add_command(ping)
 bot.tree.add_command(stats)
 bot.tree.add_command(cancel_reminder)
 bot.tree.add_command(snooze_reminder)
+bot.tree.add_command(delivery_mode_slash)
 bot.tree.add_command(roast)  # Add this
 
 @bot.command(name="remindme")
 async def remind_me_prefix(ctx, *, reminder_input: str):
-    time_pattern = re.compile(r"(\d+)\s*(d(ays?)?|h(ours?)?|m(in(utes?)?|ins?)?|s(ec(onds?)?|ecs?)?)\b", re.IGNORECASE)
-    matches = list(time_pattern.finditer(reminder_input))
-    
-    if not matches:
-        embed = CustomEmbed.error("Invalid Time Format", "Use something like `14m`, `1h30m`, `2d5s`, or `10s`.")
-        await ctx.send(embed=embed)
-        return
-    
-    total_seconds = 0
-    for match in matches:
-        value = int(match.group(1))
-        unit = match.group(2).lower()
-        if unit.startswith("d"):
-            total_seconds += value * 86400
-        elif unit.startswith("h"):
-            total_seconds += value * 3600
-        elif unit.startswith("m"):
-            total_seconds += value * 60
-        elif unit.startswith("s"):
-            total_seconds += value
+    preferences = await get_user_preferences(ctx.author.id)
+    parsed = parse_reminder_input(reminder_input, tz=preferences.timezone)
+    total_seconds = parsed.delay_seconds() if parsed else 0
     
     if total_seconds <= 0:
-        embed = CustomEmbed.error("Invalid Time Format", "Use something like `14m`, `1h30m`, `2d5s`, or `10s`.")
+        embed = CustomEmbed.error("Invalid Time Format", "Use something like `14m`, `1h30m`, `2d5s`, `tomorrow 9am` or `2025-01-01 09:00`.")
         await ctx.send(embed=embed)
         return
     
-    last_match = matches[-1]
-    end_index = last_match.end()
-    reminder_message = reminder_input[end_index:].strip() or "for no reason"
+    reminder_message = parsed.message or "for no reason"
     await remind_me_logic(ctx, reminder_message, total_seconds)
 
 @bot.command(name="checkreminders")
 async def check_reminders_prefix(ctx):
     await check_reminders_logic(ctx)
 
+@bot.command(name="sync")
+@commands.is_owner()
+async def sync_prefix(ctx):
+    # Force a sync, e.g. after editing commands in the Discord developer portal
+    try:
+        synced = await sync_commands(bot.tree, force=True)
+    except Exception as e:
+        await ctx.send(embed=CustomEmbed.error("Sync Failed", str(e)))
+        return
+    await ctx.send(f"Synced {len(synced)} command(s).")
+
 if __name__ == "__main__":
-    bot.run(BOT_TOKEN)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run JubJub")
+    parser.add_argument("--sync", action="store_true", help="sync slash commands even if the command tree is unchanged")
+    bot.force_sync = parser.parse_args().sync
+    setup_logging()
+    # log_handler=None: discord.py's loggers go through ours instead of its own stderr handler
+    bot.run(BOT_TOKEN, log_handler=None)
\ No newline at end of file
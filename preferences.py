@@ -0,0 +1,112 @@
+# preferences.py
+# Cached per-user settings (timezone and anything else stored in user_preferences)
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta, timezone
+from functools import lru_cache
+from storage import storage
+from single_flight import SingleFlight
+from config import PREFERENCES_CACHE_TTL_SECONDS, PREFERENCES_NEGATIVE_TTL_SECONDS, PREFERENCES_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=128)
+def parse_utc_offset(offset: str):
+    # "+05:30" / "-04" style offsets -> a shared timezone object; None if malformed
+    try:
+        hours = int(offset[1:3])
+        minutes = int(offset[4:6]) if len(offset) > 4 else 0
+        sign = -1 if offset[0] == '-' else 1
+        return timezone(timedelta(hours=sign * hours, minutes=sign * minutes))
+    except (ValueError, IndexError):
+        return None
+
+class UserPreferences:
+    __slots__ = ("row", "timezone")
+
+    def __init__(self, user_id, row: dict = None):
+        self.row = row or {}
+        self.timezone = timezone.utc
+        timezone_str = self.row.get("timezone")
+        if timezone_str:
+            tz = parse_utc_offset(timezone_str)
+            if tz is None:
+                logger.warning("Invalid timezone format %r, defaulting to UTC", timezone_str, extra={"user_id": str(user_id)})
+            else:
+                self.timezone = tz
+
+    def get(self, key: str, default=None):
+        value = self.row.get(key)
+        return default if value is None else value
+
+class UserPreferencesCache:
+    # TTL + LRU cache of user_preferences rows. Users without a row are cached too
+    # (for a shorter time) so they don't cost a query on every reminder.
+    def __init__(self, loader, ttl_seconds: float, negative_ttl_seconds: float, max_size: int, bulk_loader=None):
+        self._loader = loader  # async (user_id) -> row dict or None
+        self._bulk_loader = bulk_loader  # async (user_ids) -> rows, for prefetch
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user_id -> (expires_at, UserPreferences)
+        self._loads = SingleFlight()  # user_id -> load in progress
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, user_id) -> UserPreferences:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+        return await self._loads.run(key, self._load, key)
+
+    async def _load(self, key: str) -> UserPreferences:
+        return self._store(key, await self._loader(key))
+
+    async def prefetch(self, user_ids):
+        # Load every listed user that isn't cached with one bulk query, e.g. a whole delivery batch
+        if self._bulk_loader is None:
+            return
+        now = time.monotonic()
+        missing = []
+        for key in {str(user_id) for user_id in user_ids}:
+            entry = self._entries.get(key)
+            if (entry is None or entry[0] <= now) and key not in self._loads:
+                missing.append(key)
+        if not missing:
+            return
+        rows = {str(row["user_id"]): row for row in await self._bulk_loader(missing)}
+        for key in missing:
+            self._store(key, rows.get(key))
+
+    def _store(self, key: str, row: dict) -> UserPreferences:
+        preferences = UserPreferences(key, row)
+        ttl = self.ttl_seconds if row else self.negative_ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, preferences)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return preferences
+
+    def invalidate(self, user_id):
+        self._entries.pop(str(user_id), None)
+
+user_preferences = UserPreferencesCache(
+    storage.fetch_user_preferences, PREFERENCES_CACHE_TTL_SECONDS, PREFERENCES_NEGATIVE_TTL_SECONDS, PREFERENCES_CACHE_SIZE,
+    bulk_loader=storage.fetch_user_preferences_many
+)
+
+async def get_user_preferences(user_id) -> UserPreferences:
+    return await user_preferences.get(user_id)
+
+async def update_user_preferences(user_id, values: dict):
+    # Write-through: persist, then drop the cached copy so the next read sees the change
+    ok = await storage.upsert_user_preferences(str(user_id), values)
+    user_preferences.invalidate(user_id)
+    return ok
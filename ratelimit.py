@@ -0,0 +1,102 @@
+# ratelimit.py
+# Token-bucket rate limits for slash commands and autocomplete
+
+import time
+from collections import OrderedDict
+import discord
+from discord import app_commands
+from metrics import registry
+from config import RATE_LIMIT_MAX_KEYS
+
+RATE_LIMITED = registry.counter(
+    "jubjub_rate_limited_total", "Interactions rejected by a rate limit", ("command", "scope")
+)
+
+class RateLimited(app_commands.CheckFailure):
+    def __init__(self, retry_after: float, scope: str):
+        self.retry_after = retry_after
+        self.scope = scope
+        super().__init__(f"Rate limited ({scope}), retry in {retry_after:.1f}s")
+
+class RateLimiter:
+    # `rate` tokens per `per` seconds, bursting up to `burst` (default `rate`). Each key is one
+    # (tokens, updated_at) tuple in an OrderedDict kept in last-hit order, so buckets idle long
+    # enough to have refilled completely, which are indistinguishable from new ones, are popped
+    # off the front as part of each hit.
+    def __init__(self, rate: float, per: float, burst: float = None, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = burst or rate
+        self.refill = rate / per  # Tokens per second
+        self.idle_seconds = self.capacity / self.refill
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def hit(self, key, now: float = None) -> float:
+        # Takes a token for key; returns 0.0 if allowed, otherwise seconds until one is available
+        now = time.monotonic() if now is None else now
+        entry = self._buckets.pop(key, None)
+        tokens = self.capacity if entry is None else min(self.capacity, entry[0] + (now - entry[1]) * self.refill)
+        self._evict(now)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / self.refill
+
+    def refund(self, key):
+        # Gives back a token taken by hit(), for a request another limit went on to reject
+        entry = self._buckets.get(key)
+        if entry is not None:
+            self._buckets[key] = (min(self.capacity, entry[0] + 1), entry[1])
+
+    def _evict(self, now: float):
+        buckets = self._buckets
+        while buckets:
+            key, (tokens, updated_at) = next(iter(buckets.items()))
+            if updated_at + self.idle_seconds > now and len(buckets) < self.max_keys:
+                break
+            buckets.popitem(last=False)
+
+limiters = []
+registry.gauge("jubjub_rate_limit_buckets", "Token buckets currently tracked", function=lambda: sum(len(limiter) for limiter in limiters))
+
+def scope_key(interaction: discord.Interaction, scope: str):
+    # DMs have no guild, so guild limits fall back to the user there
+    if scope == "user":
+        return interaction.user.id
+    if scope == "guild":
+        return interaction.guild_id or interaction.user.id
+    if scope == "global":
+        return None
+    raise ValueError(f"Unknown rate limit scope: {scope!r}")
+
+def rate_limit(rate: float, per: float, scope: str = "user", burst: float = None):
+    # Slash command check; stack several for per-user and per-guild limits on one command.
+    # A rejection raises RateLimited, which JubJubTree.on_error answers with the cooldown embed,
+    # and refunds the tokens the checks before it took, so a user's rejected requests don't use
+    # up the guild's budget.
+    limiter = RateLimiter(rate, per, burst)
+    limiters.append(limiter)
+
+    def predicate(interaction: discord.Interaction) -> bool:
+        key = scope_key(interaction, scope)
+        taken = interaction.extras.setdefault("rate_limit_taken", [])
+        retry_after = limiter.hit(key)
+        if retry_after:
+            for earlier, earlier_key in taken:
+                earlier.refund(earlier_key)
+            taken.clear()
+            command = interaction.command.qualified_name if interaction.command else "unknown"
+            RATE_LIMITED.inc(command=command, scope=scope)
+            raise RateLimited(retry_after, scope)
+        taken.append((limiter, key))
+        return True
+    return app_commands.check(predicate)
+
+def autocomplete_limiter(rate: float, per: float, burst: float = None) -> RateLimiter:
+    # Checks don't run for autocomplete, so handlers call hit() on one of these themselves
+    limiter = RateLimiter(rate, per, burst)
+    limiters.append(limiter)
+    return limiter
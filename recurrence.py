@@ -0,0 +1,81 @@
+# recurrence.py
+# Closed-form next-occurrence math for recurring reminders
+
+import calendar
+from datetime import datetime, timedelta, timezone
+from time_parser import parse_clock
+
+PERIODS = {"daily": timedelta(days=1), "weekly": timedelta(days=7)}
+
+def parse_recurrence_time(recurrence_time: str):
+    # Stored as "HH:MM", but rows written before that was enforced may hold "7pm" and the like
+    clock = parse_clock(recurrence_time)
+    if clock is None:
+        raise ValueError(f"Invalid recurrence time: {recurrence_time!r}")
+    return clock
+
+def _add_months(value: datetime, months: int, anchor_day: int) -> datetime:
+    # Shift by whole months, clamping the day (e.g. the 31st becomes Feb 28/29)
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(anchor_day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+def _next(base: datetime, recurrence: str, now: datetime, anchor_day: int) -> datetime:
+    if recurrence in PERIODS:
+        period = PERIODS[recurrence]
+        if base + period > now:
+            return base + period
+        return base + ((now - base) // period + 1) * period
+    if recurrence == "monthly":
+        months = max(1, (now.year - base.year) * 12 + now.month - base.month)
+        next_time = _add_months(base, months, anchor_day)
+        return next_time if next_time > now else _add_months(base, months + 1, anchor_day)
+    if recurrence == "yearly":
+        years = max(1, now.year - base.year)
+        next_time = _add_months(base, 12 * years, anchor_day)
+        return next_time if next_time > now else _add_months(base, 12 * (years + 1), anchor_day)
+    raise ValueError("Invalid recurrence pattern")
+
+def occurrences_until(first: datetime, recurrence: str, now: datetime, anchor_day: int = None) -> int:
+    # How many occurrences, starting with first itself, have come due by now; O(1) like _next
+    if first > now:
+        return 0
+    if recurrence in PERIODS:
+        return (now - first) // PERIODS[recurrence] + 1
+    if recurrence not in ("monthly", "yearly"):
+        raise ValueError("Invalid recurrence pattern")
+    step = 1 if recurrence == "monthly" else 12
+    anchor_day = anchor_day or first.day
+    steps = ((now.year - first.year) * 12 + now.month - first.month) // step
+    if _add_months(first, steps * step, anchor_day) > now:
+        steps -= 1
+    return steps + 1
+
+def next_occurrence(last_time: datetime, recurrence: str, recurrence_time: str,
+                    now: datetime = None, anchor_day: int = None) -> datetime:
+    # First occurrence after last_time that is also after now, in O(1) however long ago
+    # last_time was. anchor_day is the intended day of month for monthly/yearly reminders
+    # (defaults to last_time's day), so a reminder on the 31st still lands on the last day
+    # of shorter months.
+    now = now or datetime.now(timezone.utc)
+    hour, minute = parse_recurrence_time(recurrence_time)
+    base = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return _next(base, recurrence, now, anchor_day or last_time.day)
+
+def next_occurrences(reminders: list, now: datetime = None) -> list:
+    # Batch version for reminder rows: one clock read and each recurrence_time parsed once
+    now = now or datetime.now(timezone.utc)
+    clock_cache = {}
+    results = []
+    for reminder in reminders:
+        recurrence_time = reminder["recurrence_time"]
+        if recurrence_time not in clock_cache:
+            clock_cache[recurrence_time] = parse_recurrence_time(recurrence_time)
+        hour, minute = clock_cache[recurrence_time]
+        last_time = datetime.fromisoformat(reminder["reminder_time"])
+        base = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        # reminder_time may already be clamped (Feb 28), so the stored anchor_day decides the day
+        results.append(_next(base, reminder["recurrence"], now, reminder.get("anchor_day") or last_time.day))
+    return results
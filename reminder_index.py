@@ -0,0 +1,50 @@
+# reminder_index.py
+# In-process index of active reminders by owner, for id lookups without a database query
+
+from collections import OrderedDict
+
+class ReminderIndex:
+    # user_id -> {reminder_id: row} for the active reminders this process has created, scheduled
+    # or listed, LRU-bounded by user. It is a hint, not the source of truth: other processes can
+    # change rows behind it, so writes based on an indexed row are conditional on it being current.
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._users = OrderedDict()  # user_id -> {reminder_id: reminder}
+        self._owners = {}  # reminder_id -> user_id
+
+    def __len__(self):
+        return len(self._owners)
+
+    def get(self, user_id, reminder_id: int):
+        reminders = self._users.get(str(user_id))
+        if reminders is None:
+            return None
+        self._users.move_to_end(str(user_id))
+        return reminders.get(reminder_id)
+
+    def add(self, reminder: dict):
+        # Sent reminders aren't active any more, so adding one just drops it
+        if reminder.get("is_sent"):
+            self.discard(reminder["id"])
+            return
+        user_id = str(reminder["user_id"])
+        reminders = self._users.get(user_id)
+        if reminders is None:
+            reminders = self._users[user_id] = {}
+            if len(self._users) > self.max_users:
+                _, evicted = self._users.popitem(last=False)
+                for reminder_id in evicted:
+                    self._owners.pop(reminder_id, None)
+        self._users.move_to_end(user_id)
+        reminders[reminder["id"]] = reminder
+        self._owners[reminder["id"]] = user_id
+
+    def discard(self, reminder_id: int):
+        user_id = self._owners.pop(reminder_id, None)
+        if user_id is None:
+            return
+        reminders = self._users.get(user_id)
+        if reminders is not None:
+            reminders.pop(reminder_id, None)
+            if not reminders:
+                del self._users[user_id]
@@ -1,16 +1,57 @@
 # reminders.py
 # Reminder commands and logic
 
+import logging
 import discord
 from discord import app_commands
 from discord.ext import tasks
-import re
+import asyncio
+import time
 from datetime import datetime, timedelta, timezone
-import aiohttp
 from embeds import CustomEmbed
-from database import post_data, patch_data, fetch_reminders, fetch_due_reminders
+from storage import storage
 from utility_commands import track_command_usage
-from config import SUPABASE_URL, SUPABASE_HEADERS  # Add this import
+from preferences import get_user_preferences, update_user_preferences, user_preferences
+from time_parser import parse_clock, duration_from_units
+from recurrence import next_occurrence, next_occurrences, occurrences_until
+from scheduler import ReminderScheduler
+from delivery import DeliveryPipeline
+from resolver import Resolver
+from reminder_index import ReminderIndex
+from ratelimit import rate_limit
+from metrics import registry, SCHEDULER_TICK
+from config import (
+    SCHEDULER_LOOKAHEAD_SECONDS, SCHEDULER_RECONCILE_SECONDS, DELIVERY_WORKERS, STATE_FLUSH_CHUNK,
+    REMINDER_PAGE_SIZE, WORKER_ID, REMINDER_LEASE_SECONDS, RESOLVER_CACHE_TTL_SECONDS, RESOLVER_CACHE_SIZE,
+    REMINDER_INDEX_USERS, CATCHUP_PAGE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# Fires reminders due within the lookahead window; check_for_reminders keeps it in sync
+reminder_scheduler = ReminderScheduler(SCHEDULER_LOOKAHEAD_SECONDS)
+# Sends the Discord messages for fired reminders, one queue per channel/user route
+delivery_pipeline = DeliveryPipeline(DELIVERY_WORKERS)
+# Users and channels reminders are delivered to, so most deliveries skip a REST lookup
+user_resolver = Resolver("user", RESOLVER_CACHE_TTL_SECONDS, RESOLVER_CACHE_SIZE)
+channel_resolver = Resolver("channel", RESOLVER_CACHE_TTL_SECONDS, RESOLVER_CACHE_SIZE)
+# Active reminders by owner, so cancel/snooze by id don't have to query for the row first
+reminder_index = ReminderIndex(REMINDER_INDEX_USERS)
+# Where reminders go, per user: the channel they were set in, a DM, or both (the default)
+DELIVERY_MODES = ("channel", "dm", "both")
+# Reminders sharing a message: each gets a row of snooze buttons and Discord allows five rows,
+# and all embeds in a message share a 6000 character budget
+MAX_REMINDERS_PER_MESSAGE = 5
+MAX_EMBED_CHARS = 6000
+EMBED_OVERHEAD_CHARS = 300  # Title, fields and footer around each reminder's text
+# Reminders this process holds a lease on and hasn't persisted or released yet
+claimed_ids = set()
+# Set by drain_reminders at shutdown: no new catch-up pages or scheduler batches
+draining = False
+# True while a check_for_reminders pass is running rather than sleeping until the next one
+reconciling = False
+registry.gauge("jubjub_delivery_queue_depth", "Delivery jobs waiting in the pipeline", function=lambda: delivery_pipeline.queue_depth)
+registry.gauge("jubjub_scheduled_reminders", "Reminders held by the in-memory scheduler", function=lambda: len(reminder_scheduler))
 
 async def remind_me_logic(ctx, reminder_message: str, total_seconds: int, recurrence: str = "none", time_str: str = None):
     now_utc = datetime.now(timezone.utc)
@@ -20,28 +61,30 @@ async def remind_me_logic(ctx, reminder_message: str, total_seconds: int, recurr
             embed = CustomEmbed.error("Missing Time", "Please specify a time of day (e.g., '07:00') for recurring reminders.")
             await (ctx.response.send_message(embed=embed, ephemeral=True) if hasattr(ctx, 'response') else ctx.send(embed=embed))
             return
-        try:
-            reminder_hour, reminder_minute = map(int, time_str.split(":"))
-            if not (0 <= reminder_hour <= 23 and 0 <= reminder_minute <= 59):
-                raise ValueError
-        except ValueError:
+        clock = parse_clock(time_str)
+        if clock is None:
             embed = CustomEmbed.error("Invalid Time Format", "Time must be in 'HH:MM' format (e.g., '07:00' or '19:00').")
             await (ctx.response.send_message(embed=embed, ephemeral=True) if hasattr(ctx, 'response') else ctx.send(embed=embed))
             return
+        reminder_hour, reminder_minute = clock
+        # "7pm" and "19:00" are stored alike, as the "HH:MM" the recurrence code reads back
+        time_str = f"{reminder_hour:02d}:{reminder_minute:02d}"
     else:
         reminder_hour, reminder_minute = None, None
 
+    anchor_day = None
     if recurrence == "none":
         reminder_time = now_utc + timedelta(seconds=total_seconds)
     else:
         reminder_time = now_utc.replace(hour=reminder_hour, minute=reminder_minute, second=0, microsecond=0)
         if total_seconds > 0:
             reminder_time += timedelta(seconds=total_seconds)
+        # The day of month monthly/yearly occurrences land on, clamped in shorter months
+        anchor_day = reminder_time.day
         if reminder_time <= now_utc:
-            reminder_time = calculate_next_occurrence(reminder_time, recurrence, time_str)
+            reminder_time = next_occurrence(reminder_time, recurrence, time_str, now_utc)
 
-    async with aiohttp.ClientSession() as session:
-        user_tz = await get_user_timezone(ctx.user.id, session)
+    user_tz = await get_user_timezone(ctx.user.id)
     localized_time = reminder_time.astimezone(user_tz)
     
     payload = {
@@ -53,11 +96,14 @@ async def remind_me_logic(ctx, reminder_message: str, total_seconds: int, recurr
         "recurrence": recurrence,
         "recurrence_time": time_str if recurrence != "none" else None,
         "next_occurrence": None,
+        "anchor_day": anchor_day,
         "is_sent": False
     }
     
-    status, response_text = await post_data("reminders", payload)
-    if status == 201:
+    created = await storage.create_reminder(payload)
+    if created:
+        reminder_scheduler.schedule(created)
+        reminder_index.add(created)
         embed = CustomEmbed.success(
             "Reminder Set!",
             f"I'll remind you to: **{reminder_message}**",
@@ -68,103 +114,302 @@ async def remind_me_logic(ctx, reminder_message: str, total_seconds: int, recurr
         embed.add_field(name="Recurrence", value=recurrence_text, inline=False)
         await (ctx.response.send_message(embed=embed) if hasattr(ctx, 'response') else ctx.send(embed=embed))
     else:
-        print(f"Failed to create reminder. Status: {status}, Response: {response_text}")
-        embed = CustomEmbed.error("Failed to Set Reminder", f"Status: {status}. Please try again.")
+        embed = CustomEmbed.error("Failed to Set Reminder", "Something went wrong while saving the reminder. Please try again.")
         await (ctx.response.send_message(embed=embed, ephemeral=True) if hasattr(ctx, 'response') else ctx.send(embed=embed))
 
-async def get_user_timezone(user_id: int, session):
-    url = f"{SUPABASE_URL}/user_preferences?user_id=eq.{user_id}"
-    async with session.get(url, headers=SUPABASE_HEADERS) as pref_response:
-        if pref_response.status == 200:
-            preferences = await pref_response.json()
-            if preferences and "timezone" in preferences[0]:
-                timezone_str = preferences[0]["timezone"]
-                if timezone_str:
-                    try:
-                        hours = int(timezone_str[1:3])
-                        minutes = int(timezone_str[4:6]) if len(timezone_str) > 4 else 0
-                        sign = -1 if timezone_str[0] == '-' else 1
-                        return timezone(timedelta(hours=sign * hours, minutes=sign * minutes))
-                    except (ValueError, IndexError) as e:
-                        print(f"Invalid timezone format for user {user_id}: {timezone_str}, defaulting to UTC. Error: {e}")
-        return timezone.utc
-
-def calculate_next_occurrence(last_time: datetime, recurrence: str, recurrence_time: str) -> datetime:
+async def get_user_timezone(user_id: int):
+    preferences = await get_user_preferences(user_id)
+    return preferences.timezone
+
+async def deliver_message(reminders: list) -> bool:
+    # Deliver up to MAX_REMINDERS_PER_MESSAGE of one user's reminders for one channel as a single
+    # message per route (the mention rides along with the embeds). The user's delivery mode picks
+    # the routes; a single-route mode falls back to the other route if its send fails.
+    # Returns True if it reached the user through at least one route.
+    from bot_setup import bot
+    user_id = int(reminders[0]["user_id"])
+    channel_id = int(reminders[0]["channel_id"])
+    ids = [r["id"] for r in reminders]
+    try:
+        # REST fetches still go through the pipeline so they share the route's rate limit with sends
+        user, channel = await asyncio.gather(
+            user_resolver.resolve(
+                user_id, bot.get_user, lambda i: delivery_pipeline.submit(("user", i), lambda: bot.fetch_user(i))
+            ),
+            channel_resolver.resolve(
+                channel_id, bot.get_channel, lambda i: delivery_pipeline.submit(("channel", i), lambda: bot.fetch_channel(i))
+            )
+        )
+    except Exception as e:
+        logger.warning("Failed to resolve user or channel: %s", e, extra={"reminder_ids": ids, "user_id": user_id, "channel_id": channel_id})
+        return False
+    if not user or not channel:
+        return False
+
+    preferences = await get_user_preferences(user_id)
+    mode = preferences.get("delivery_mode", "both")
+    if mode not in DELIVERY_MODES:
+        mode = "both"
+    # A recurring reminder that came due several times while the bot was down is sent once,
+    # saying how many occurrences it stands for; flush_reminder_states then skips past them all
     now = datetime.now(timezone.utc)
-    hour, minute = map(int, recurrence_time.split(":"))
-    
-    if recurrence == "daily":
-        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=1)
-        while next_time <= now:
-            next_time += timedelta(days=1)
-    elif recurrence == "weekly":
-        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        while next_time <= now:
-            next_time += timedelta(days=7)
-    elif recurrence == "monthly":
-        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        if last_time.month == 12:
-            next_time = next_time.replace(year=last_time.year + 1, month=1)
+    embeds = [
+        CustomEmbed.reminder(
+            user, r["message"], datetime.fromisoformat(r["reminder_time"]), datetime.fromisoformat(r["set_time"]),
+            channel, r["recurrence"], r["recurrence_time"],
+            missed=occurrences_until(datetime.fromisoformat(r["reminder_time"]), r["recurrence"], now, r.get("anchor_day")) if r["recurrence"] != "none" else 0
+        )
+        for r in reminders
+    ]
+    view = snooze_view([r["id"] for r in reminders])
+    due_ts = min(ReminderScheduler.due_timestamp(r) for r in reminders)
+    sends = {
+        "dm": lambda: delivery_pipeline.submit(("user", user.id), lambda: user.send(embeds=embeds, view=view), due_ts),
+        "channel": lambda: delivery_pipeline.submit(
+            ("channel", channel.id), lambda: channel.send(f"<@{user.id}>", embeds=embeds, view=view), due_ts
+        ),
+    }
+
+    async def send(routes) -> bool:
+        results = await asyncio.gather(*(sends[route]() for route in routes), return_exceptions=True)
+        for route, result in zip(routes, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to deliver via %s: %s", route, result, extra={"reminder_ids": ids, "user_id": user_id, "channel_id": channel_id})
+        return not all(isinstance(result, Exception) for result in results)
+
+    if await send(("dm", "channel") if mode == "both" else (mode,)):
+        return True
+    if mode == "both":
+        return False
+    fallback = "channel" if mode == "dm" else "dm"
+    logger.info("Retrying via %s", fallback, extra={"reminder_ids": ids, "user_id": user_id})
+    return await send((fallback,))
+
+def message_batches(reminders: list) -> list:
+    # Coalesce a tick's reminders per (user, channel), split into messages Discord will accept
+    groups = {}
+    for reminder in reminders:
+        groups.setdefault((reminder["user_id"], reminder["channel_id"]), []).append(reminder)
+    batches = []
+    for group in groups.values():
+        batch, size = [], 0
+        for reminder in group:
+            cost = len(reminder["message"]) + EMBED_OVERHEAD_CHARS
+            if batch and (len(batch) == MAX_REMINDERS_PER_MESSAGE or size + cost > MAX_EMBED_CHARS):
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(reminder)
+            size += cost
+        batches.append(batch)
+    return batches
+
+async def flush_reminder_states(delivered: list):
+    # Persist a whole tick's worth of deliveries: one conditional update for one-time reminders
+    # and one for recurring ones, in chunks only when the batch is huge. Both only touch rows this
+    # worker still holds at the time it delivered, so a cancel or snooze in the meantime wins.
+    sent = [{"id": r["id"], "reminder_time": r["reminder_time"]} for r in delivered if r["recurrence"] == "none"]
+    recurring = [r for r in delivered if r["recurrence"] != "none"]
+    # Recurring reminders stay active (and unclaimed) so the scheduler picks up the next occurrence
+    advances = [
+        {"id": reminder["id"], "reminder_time": reminder["reminder_time"], "next_time": next_time.isoformat()}
+        for reminder, next_time in zip(recurring, next_occurrences(recurring))
+    ]
+
+    async def release_skipped(chunk, persisted):
+        # Cancelled or snoozed during delivery (or the write failed): give the lease back and
+        # leave the row as it is for the next reconciliation
+        skipped = {item["id"] for item in chunk} - set(persisted)
+        if skipped:
+            await storage.release_reminders(list(skipped), WORKER_ID)
+
+    async def flush_sent(chunk):
+        marked = await storage.mark_reminders_sent(chunk, WORKER_ID)
+        logger.debug("Marked %d reminder(s) as sent", len(marked))
+        for reminder_id in marked:
+            reminder_index.discard(reminder_id)
+        await release_skipped(chunk, marked)
+
+    async def flush_recurring(chunk):
+        advanced = await storage.advance_reminders(chunk, WORKER_ID)
+        logger.debug("Updated %d recurring reminder(s) with their next occurrence", len(advanced))
+        for reminder in advanced:
+            reminder_scheduler.schedule(reminder)
+            reminder_index.add(reminder)
+        await release_skipped(chunk, [reminder["id"] for reminder in advanced])
+
+    await asyncio.gather(
+        *(flush_sent(sent[i:i + STATE_FLUSH_CHUNK]) for i in range(0, len(sent), STATE_FLUSH_CHUNK)),
+        *(flush_recurring(advances[i:i + STATE_FLUSH_CHUNK]) for i in range(0, len(advances), STATE_FLUSH_CHUNK))
+    )
+
+async def claim_reminders(reminders: list) -> list:
+    # Lease the batch to this process first, so another bot process sharing the database
+    # never sends the same reminder; rows someone else holds are simply skipped
+    ids = [r["id"] for r in reminders]
+    chunks = await asyncio.gather(*(
+        storage.claim_reminders(ids[i:i + STATE_FLUSH_CHUNK], WORKER_ID, REMINDER_LEASE_SECONDS)
+        for i in range(0, len(ids), STATE_FLUSH_CHUNK)
+    ))
+    claimed = [reminder for chunk in chunks for reminder in chunk]
+    if len(claimed) < len(reminders):
+        logger.info("Claimed %d/%d due reminders, the rest are taken or no longer due", len(claimed), len(reminders))
+    return claimed
+
+async def deliver_reminders(reminders: list) -> int:
+    # Returns how many were delivered
+    reminders = await claim_reminders(reminders)
+    if not reminders:
+        return 0
+    ids = [r["id"] for r in reminders]
+    claimed_ids.update(ids)
+    try:
+        delivered = await _deliver_claimed(reminders)
+    except Exception:
+        claimed_ids.difference_update(ids)
+        raise
+    # Left in claimed_ids if cancelled mid-delivery, so drain_reminders can release them
+    claimed_ids.difference_update(ids)
+    return delivered
+
+async def _deliver_claimed(reminders: list) -> int:
+    # Delivery modes for everyone in the batch in one query instead of one per user
+    try:
+        await user_preferences.prefetch(r["user_id"] for r in reminders)
+    except Exception as e:
+        logger.warning("Failed to prefetch preferences for %d reminder(s): %s", len(reminders), e)
+    # Every message in the batch is in flight at once; the pipeline bounds the actual concurrency
+    batches = message_batches(reminders)
+    results = await asyncio.gather(*(deliver_message(batch) for batch in batches), return_exceptions=True)
+    delivered, failed = [], []
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            logger.error("Failed to deliver reminder(s)", exc_info=result, extra={"reminder_ids": [r["id"] for r in batch]})
+        if result is True:
+            delivered.extend(batch)
         else:
-            next_time = next_time.replace(month=last_time.month + 1)
-        while next_time <= now:
-            if next_time.month == 12:
-                next_time = next_time.replace(year=next_time.year + 1, month=1)
-            else:
-                next_time = next_time.replace(month=next_time.month + 1)
-    elif recurrence == "yearly":
-        next_time = last_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        next_time = next_time.replace(year=last_time.year + 1)
-        while next_time <= now:
-            next_time = next_time.replace(year=next_time.year + 1)
-    else:
-        raise ValueError("Invalid recurrence pattern")
-    return next_time
+            failed.extend(r["id"] for r in batch)
+    logger.info(
+        "Delivered %d/%d reminders in %d message(s)", len(delivered), len(reminders), len(batches),
+        extra={"pipeline": delivery_pipeline.stats()}
+    )
+    if failed:
+        # Give up the lease so the next reconciliation (here or in another process) retries them
+        await storage.release_reminders(failed, WORKER_ID)
+    if delivered:
+        await flush_reminder_states(delivered)
+    return len(delivered)
+
+async def catch_up(until: datetime):
+    # Reminders already overdue when reconciliation runs (after downtime, or given back by a
+    # failed delivery) are streamed in ordered pages of CATCHUP_PAGE_SIZE rather than pulled in
+    # one unbounded query, each page claimed, delivered and persisted before the next is read
+    after, total, processed, delivered, pages = None, None, 0, 0, 0
+    started_at = time.monotonic()
+    while not draining:
+        try:
+            page, count = await storage.fetch_due_reminders_page(
+                until, WORKER_ID, after=after, limit=CATCHUP_PAGE_SIZE, count=after is None
+            )
+        except Exception:
+            # Without this page there's no key to continue from; the next pass starts over
+            logger.exception("Failed to read overdue reminders", extra={"page": pages + 1})
+            break
+        if after is None:
+            total = count
+        if not page:
+            break
+        after = (page[-1]["reminder_time"], page[-1]["id"])
+        # Rows already in the scheduler are delivered by it, not twice
+        held = reminder_scheduler.hold(page)
+        try:
+            delivered += await deliver_reminders(held) if held else 0
+        except Exception:
+            # Like a failed scheduler batch: give the page's leases back and carry on with the next
+            ids = [reminder["id"] for reminder in held]
+            logger.exception("Catch-up delivery failed", extra={"page": pages + 1, "reminder_ids": ids})
+            try:
+                await storage.release_reminders(ids, WORKER_ID)
+            except Exception as e:
+                logger.warning("Failed to release %d reminder(s): %s", len(ids), e)
+        finally:
+            for reminder in held:
+                reminder_scheduler.done(reminder["id"])
+        processed += len(page)
+        pages += 1
+        if total and total > CATCHUP_PAGE_SIZE:
+            logger.info("Catch-up progress: %d/%d overdue reminder(s) processed", processed, total,
+                        extra={"delivered": delivered, "page": pages})
+        if len(page) < CATCHUP_PAGE_SIZE:
+            break
+    if processed:
+        SCHEDULER_TICK.observe(time.monotonic() - started_at, phase="catch_up")
+        logger.info("Caught up on %d overdue reminder(s)", processed,
+                    extra={"delivered": delivered, "pages": pages, "seconds": round(time.monotonic() - started_at, 3)})
 
-@tasks.loop(seconds=60)
+# Safety net: reload everything due within the lookahead window so the heap matches storage
+@tasks.loop(seconds=SCHEDULER_RECONCILE_SECONDS)
 async def check_for_reminders():
-    print("Checking for reminders...")
-    reminders = await fetch_due_reminders()
-    print(f"Fetched reminders: {len(reminders)}")
-    
-    from bot_setup import bot
+    global reconciling
+    reconciling = True
+    try:
+        await reconcile_reminders()
+    finally:
+        reconciling = False
+
+async def reconcile_reminders():
+    logger.debug("Reconciling reminder schedule")
+    await catch_up(datetime.now(timezone.utc))
+    if draining:
+        return
+    started_at = time.monotonic()
+    horizon = datetime.fromtimestamp(reminder_scheduler.horizon(), timezone.utc)
+    reminders = await storage.fetch_due_reminders(horizon, WORKER_ID)
+    reminder_scheduler.reconcile(reminders, started_at)
     for reminder in reminders:
-        user = await bot.fetch_user(int(reminder["user_id"]))
-        if user:
-            channel = bot.get_channel(int(reminder["channel_id"]))
-            if channel:
-                await channel.send(f"<@{user.id}>")
-                set_time = datetime.fromisoformat(reminder["set_time"])
-                embed = CustomEmbed.reminder(
-                    user, reminder["message"], datetime.fromisoformat(reminder["reminder_time"]),
-                    set_time, channel, reminder["recurrence"], reminder["recurrence_time"]
-                )
-                view = SnoozeView(reminder["id"])
-                await user.send(embed=embed, view=view)
-                await channel.send(embed=embed, view=view)
-                
-                if reminder["recurrence"] != "none":
-                    next_occurrence = calculate_next_occurrence(
-                        datetime.fromisoformat(reminder["reminder_time"]),
-                        reminder["recurrence"],
-                        reminder["recurrence_time"]
-                    )
-                    patch_data_dict = {
-                        "is_sent": True,
-                        "next_occurrence": next_occurrence.isoformat(),
-                        "reminder_time": next_occurrence.isoformat()
-                    }
-                    status, text = await patch_data("reminders", f"id=eq.{reminder['id']}", patch_data_dict)
-                    if status not in (200, 204):
-                        print(f"Failed to update recurring reminder {reminder['id']}: Status {status}, Response: {text}")
-                    else:
-                        print(f"Updated recurring reminder {reminder['id']} with next occurrence: {next_occurrence}")
-                else:
-                    status, text = await patch_data("reminders", f"id=eq.{reminder['id']}", {"is_sent": True})
-                    if status not in (200, 204):
-                        print(f"Failed to mark reminder {reminder['id']} as sent: Status {status}, Response: {text}")
-                    else:
-                        print(f"Marked reminder {reminder['id']} as sent")
+        reminder_index.add(reminder)
+    SCHEDULER_TICK.observe(time.monotonic() - started_at, phase="reconcile")
+    logger.info("Reconciled reminder schedule", extra={"fetched": len(reminders), "scheduled": len(reminder_scheduler)})
+
+@check_for_reminders.before_loop
+async def before_check_for_reminders():
+    delivery_pipeline.start()
+    reminder_scheduler.start(deliver_reminders)
+
+@check_for_reminders.after_loop
+async def after_check_for_reminders():
+    reminder_scheduler.stop()
+    delivery_pipeline.stop()
+
+async def drain_reminders(timeout: float):
+    # Shutdown hook, run while Discord is still connected: stop firing new batches, let the
+    # deliveries under way finish and persist their state, then give back any lease left over
+    global draining
+    draining = True
+    deadline = time.monotonic() + timeout
+    finished = await reminder_scheduler.drain(timeout)
+    # A reconciliation pass stops between catch-up pages. A loop sleeping until its next pass
+    # wouldn't see stop() until it woke up, so that one is cancelled straight away.
+    task = check_for_reminders.get_task()
+    if task is not None and not task.done():
+        if not reconciling:
+            check_for_reminders.cancel()
+        else:
+            check_for_reminders.stop()
+            try:
+                await asyncio.wait_for(asyncio.shield(task), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                check_for_reminders.cancel()
+                finished = False
+            except Exception:
+                pass  # The loop reports its own errors
+    delivery_pipeline.stop()
+    if claimed_ids:
+        await storage.release_reminders(list(claimed_ids), WORKER_ID)
+    if finished:
+        logger.info("Reminder delivery drained", extra={"released": len(claimed_ids)})
+    else:
+        logger.warning("Reminder delivery cut off after %ss", timeout, extra={"released": len(claimed_ids)})
+    claimed_ids.clear()
 
 @app_commands.command(name="remindme", description="Set a one-time reminder")
 @app_commands.describe(
@@ -174,9 +419,11 @@ async def check_for_reminders():
     minutes="Minutes until the reminder",
     seconds="Seconds until the reminder"
 )
+@rate_limit(5, 60)
+@rate_limit(30, 60, scope="guild")
 async def remind_me_slash(interaction: discord.Interaction, message: str, days: int = 0, hours: int = 0, minutes: int = 0, seconds: int = 0):
     await track_command_usage(str(interaction.user.id), "remindme")
-    total_seconds = (days * 86400) + (hours * 3600) + (minutes * 60) + seconds
+    total_seconds = duration_from_units(days=days, hours=hours, minutes=minutes, seconds=seconds).seconds
     if total_seconds <= 0:
         embed = CustomEmbed.error("Invalid Time Format", "The total time must be greater than zero.")
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -196,151 +443,218 @@ async def remind_me_slash(interaction: discord.Interaction, message: str, days:
     app_commands.Choice(name="Monthly", value="monthly"),
     app_commands.Choice(name="Yearly", value="yearly"),
 ])
+@rate_limit(5, 60)
+@rate_limit(30, 60, scope="guild")
 async def remind_loop_slash(interaction: discord.Interaction, message: str, recurrence: str, time: str, days: int = 0):
     await track_command_usage(str(interaction.user.id), "remindloop")
-    total_seconds = days * 86400
+    total_seconds = duration_from_units(days=days).seconds
     await remind_me_logic(interaction, message, total_seconds, recurrence, time)
 
 async def check_reminders_logic(ctx):
     user_id = str(ctx.user.id)
-    reminders = await fetch_reminders(user_id)
-    embed = CustomEmbed.reminder_list(reminders, active_only=True)
-    view = ReminderView(user_id, reminders)
+    page, total = await storage.fetch_reminders_page(user_id, active_only=True, limit=REMINDER_PAGE_SIZE, count=True)
+    for reminder in page:
+        reminder_index.add(reminder)
+    embed = CustomEmbed.reminder_list(page, active_only=True, total=total)
+    view = ReminderView(user_id, page, total)
     await (ctx.response.send_message(embed=embed, view=view) if hasattr(ctx, 'response') else ctx.send(embed=embed, view=view))
 
 @app_commands.command(name="checkreminders", description="Check your reminders")
+@rate_limit(5, 30)
 async def check_reminders_slash(interaction: discord.Interaction):
     await track_command_usage(str(interaction.user.id), "checkreminders")
     await check_reminders_logic(interaction)
 
 @app_commands.command(name="cancelreminder", description="Cancel a specific reminder by ID")
 @app_commands.describe(id="The ID of the reminder to cancel (see /checkreminders)")
+@rate_limit(10, 60)
 async def cancel_reminder(interaction: discord.Interaction, id: int):
     await track_command_usage(str(interaction.user.id), "cancelreminder")
     user_id = str(interaction.user.id)
     
-    # Check if the reminder exists and belongs to the user
-    reminders = await fetch_reminders(user_id, active_only=True)
-    reminder = next((r for r in reminders if r["id"] == id), None)
-    
-    if not reminder:
-        embed = discord.Embed(
-            title="❌ Reminder Not Found",
-            description=f"No active reminder with ID `{id}` found. Use `/checkreminders` to see your reminders.",
-            color=discord.Color.from_rgb(255, 0, 0)  # Red like JubJub's eyes
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_footer(text="JubJub’s confused!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+    # One conditional delete checks that the reminder exists, belongs to the user and is still active
+    reminder = await storage.delete_reminder_if(id, user_id, {"is_sent": False})
+    reminder_index.discard(id)
+    if reminder:
+        reminder_scheduler.unschedule(id)
+        embed = CustomEmbed.canceled(f"Reminder `{id}` has been canceled: **{reminder['message']}**")
+        await interaction.response.send_message(embed=embed)
         return
-    
-    # Delete the reminder
-    async with aiohttp.ClientSession() as session:
-        url = f"{SUPABASE_URL}/reminders?id=eq.{id}&user_id=eq.{user_id}"
-        async with session.delete(url, headers=SUPABASE_HEADERS) as response:
-            if response.status in (200, 204):
-                embed = discord.Embed(
-                    title="🗑️ Reminder Canceled!",
-                    description=f"Reminder `{id}` has been canceled: **{reminder['message']}**",
-                    color=discord.Color.from_rgb(255, 0, 0)  # Red like JubJub's eyes
-                )
-                embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-                embed.set_footer(text="JubJub’s got it!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-                embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
-                await interaction.response.send_message(embed=embed)
-            else:
-                embed = discord.Embed(
-                    title="❌ Failed to Cancel",
-                    description="Something went wrong while canceling the reminder. Try again later.",
-                    color=discord.Color.from_rgb(255, 0, 0)
-                )
-                embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-                embed.set_footer(text="JubJub’s sorry!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-                embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+    # Nothing deleted: either there is no such reminder or the delete failed
+    if await storage.fetch_reminder(id, user_id, active_only=True):
+        embed = CustomEmbed.failure("Failed to Cancel", "Something went wrong while canceling the reminder. Try again later.")
+    else:
+        embed = CustomEmbed.not_found(f"No active reminder with ID `{id}` found. Use `/checkreminders` to see your reminders.")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
 
 @app_commands.command(name="snooze", description="Snooze a reminder by ID")
 @app_commands.describe(
     id="The ID of the reminder to snooze (see /checkreminders)",
     minutes="How many minutes to snooze (default 10)"
 )
+@rate_limit(10, 60)
 async def snooze_reminder(interaction: discord.Interaction, id: int, minutes: int = 10):
     await track_command_usage(str(interaction.user.id), "snooze")
     user_id = str(interaction.user.id)
     
     # Validate minutes
     if minutes <= 0:
-        embed = discord.Embed(
-            title="❌ Invalid Snooze Time",
-            description="Snooze time must be greater than 0 minutes.",
-            color=discord.Color.from_rgb(255, 0, 0)
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_footer(text="JubJub’s confused!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+        embed = CustomEmbed.invalid("Invalid Snooze Time", "Snooze time must be greater than 0 minutes.")
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
     
-    # Check if the reminder exists and belongs to the user
-    reminders = await fetch_reminders(user_id, active_only=True)
-    reminder = next((r for r in reminders if r["id"] == id), None)
-    
+    reminder, snoozed = await snooze_by_id(id, user_id, minutes, active_only=True)
     if not reminder:
-        embed = discord.Embed(
-            title="❌ Reminder Not Found",
-            description=f"No active reminder with ID `{id}` found. Use `/checkreminders` to see your reminders.",
-            color=discord.Color.from_rgb(255, 0, 0)
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_footer(text="JubJub’s confused!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+        embed = CustomEmbed.not_found(f"No active reminder with ID `{id}` found. Use `/checkreminders` to see your reminders.")
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
-    
-    # Update the reminder time
-    current_time = datetime.fromisoformat(reminder["reminder_time"])
-    new_time = current_time + timedelta(minutes=minutes)
-    patch_data_dict = {
-        "reminder_time": new_time.isoformat(),
-        "is_sent": False  # Reset is_sent so it triggers again
-    }
-    status, text = await patch_data("reminders", f"id=eq.{id}", patch_data_dict)
-    
-    if status in (200, 204):
-        embed = discord.Embed(
-            title="💤 Reminder Snoozed!",
-            description=f"Reminder `{id}` has been snoozed for {minutes} minutes: **{reminder['message']}**\nNew time: {new_time.strftime('%Y-%m-%d %H:%M:%S UTC')}",
-            color=discord.Color.from_rgb(255, 255, 0)  # Yellow like JubJub's pupils
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_footer(text="JubJub’s snoozing!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+    if snoozed:
+        new_time = datetime.fromisoformat(snoozed["reminder_time"])
+        embed = CustomEmbed.snoozed(f"Reminder `{id}` has been snoozed for {minutes} minutes: **{reminder['message']}**\nNew time: {new_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
         await interaction.response.send_message(embed=embed)
     else:
-        embed = discord.Embed(
-            title="❌ Failed to Snooze",
-            description="Something went wrong while snoozing the reminder. Try again later.",
-            color=discord.Color.from_rgb(255, 0, 0)
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_footer(text="JubJub’s sorry!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-        embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+        embed = CustomEmbed.failure("Failed to Snooze", "Something went wrong while snoozing the reminder. Try again later.")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+@app_commands.command(name="deliverymode", description="Choose where your reminders are delivered")
+@app_commands.describe(mode="Where your reminders should go")
+@app_commands.choices(mode=[
+    app_commands.Choice(name="Channel and DM", value="both"),
+    app_commands.Choice(name="Channel only", value="channel"),
+    app_commands.Choice(name="DM only", value="dm"),
+])
+@rate_limit(5, 60)
+async def delivery_mode_slash(interaction: discord.Interaction, mode: str):
+    await track_command_usage(str(interaction.user.id), "deliverymode")
+    if await update_user_preferences(interaction.user.id, {"delivery_mode": mode}):
+        where = {"both": "in the channel and by DM", "channel": "in the channel only", "dm": "by DM only"}[mode]
+        embed = CustomEmbed.success("Delivery Mode Updated", f"Your reminders will be delivered {where}.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    else:
+        embed = CustomEmbed.failure("Failed to Update", "Something went wrong while saving your delivery mode. Try again later.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def find_reminder(reminder_id: int, user_id: str, active_only: bool = True):
+    # The index first, then a single point lookup by id and owner
+    reminder = reminder_index.get(user_id, reminder_id)
+    if reminder is None:
+        reminder = await storage.fetch_reminder(reminder_id, user_id, active_only=active_only)
+        if reminder:
+            reminder_index.add(reminder)
+    return reminder
+
+async def snooze_occurrence(reminder: dict, minutes: int):
+    # A delivered recurring reminder has already moved on to its next occurrence, so snoozing the
+    # message means a one-time follow-up `minutes` from now; the series itself is left alone
+    now_utc = datetime.now(timezone.utc)
+    created = await storage.create_reminder({
+        "user_id": reminder["user_id"],
+        "channel_id": reminder["channel_id"],
+        "message": reminder["message"],
+        "reminder_time": (now_utc + timedelta(minutes=minutes)).isoformat(),
+        "set_time": now_utc.isoformat(),
+        "recurrence": "none",
+        "recurrence_time": None,
+        "next_occurrence": None,
+        "is_sent": False
+    })
+    if created:
+        reminder_scheduler.schedule(created)
+        reminder_index.add(created)
+    return created
+
+async def snooze_by_id(reminder_id: int, user_id: str, minutes: int, active_only: bool = True, from_now: bool = False,
+                       reminder: dict = None):
+    # Push a reminder back by `minutes` with a write conditioned on the row being as we read it,
+    # so a stale index entry (or a concurrent delivery) can't be overwritten; a mismatch rereads
+    # from storage once. Pass `reminder` if the caller already looked the row up. Returns
+    # (reminder, snoozed row), (reminder, None) if the write failed, or (None, None) if there is
+    # no such reminder.
+    if reminder is None:
+        reminder = await find_reminder(reminder_id, user_id, active_only)
+    for attempt in range(2):
+        if not reminder:
+            return None, None
+        current_time = datetime.fromisoformat(reminder["reminder_time"])
+        if from_now:
+            # Snooze from whichever is later, the reminder time or now, so a late click still lands in the future
+            current_time = max(current_time, datetime.now(timezone.utc))
+        new_time = current_time + timedelta(minutes=minutes)
+        values = {
+            "reminder_time": new_time.isoformat(),
+            "is_sent": False  # Reset is_sent so it triggers again
+        }
+        expected = {"reminder_time": reminder["reminder_time"], "is_sent": reminder["is_sent"]}
+        snoozed = await storage.update_reminder_if(reminder_id, user_id, values, expected)
+        if snoozed:
+            reminder_scheduler.schedule(snoozed)
+            reminder_index.add(snoozed)
+            return reminder, snoozed
+        reminder_index.discard(reminder_id)
+        if attempt == 0:
+            reminder = await storage.fetch_reminder(reminder_id, user_id, active_only=active_only)
+    return reminder, None
+
 class ReminderView(discord.ui.View):
-    def __init__(self, user_id, reminders):
+    # Only the page on screen and its two neighbours are held; the neighbours are
+    # prefetched with keyset queries so Next/Previous don't wait on the database.
+    def __init__(self, user_id, page, total, active_only: bool = True):
         super().__init__(timeout=180)
         self.user_id = user_id
-        self.reminders = reminders
-        self.active_only = True
+        self.max_per_page = REMINDER_PAGE_SIZE
+        self._prev = None  # list of rows, or a Task fetching them
+        self._next = None
+        self.reset(page, total, active_only)
+
+    def reset(self, page, total, active_only: bool):
+        self.cancel_prefetch()
+        self.active_only = active_only
+        self.page = page
+        self.total = total
         self.current_page = 0
-        self.max_per_page = 10
-    
+        self._prev = None
+        self._next = self.prefetch(after=True)
+        self.update_buttons()
+
+    def has_next(self) -> bool:
+        return bool(self.page) and (self.current_page + 1) * self.max_per_page < self.total
+
+    def prefetch(self, after: bool):
+        if after and not self.has_next() or not after and self.current_page == 0:
+            return None
+        edge = self.page[-1] if after else self.page[0]
+        key = (edge["reminder_time"], edge["id"])
+        return asyncio.create_task(storage.fetch_reminders_page(
+            self.user_id, self.active_only, after=key if after else None, before=None if after else key,
+            limit=self.max_per_page
+        ))
+
+    def cancel_prefetch(self):
+        for neighbour in (self._prev, self._next):
+            if isinstance(neighbour, asyncio.Task):
+                neighbour.cancel()
+
+    async def on_timeout(self):
+        self.cancel_prefetch()
+
+    @staticmethod
+    async def resolve(neighbour):
+        if isinstance(neighbour, asyncio.Task):
+            rows, _ = await neighbour
+            return rows
+        return neighbour
+
     def update_buttons(self):
-        total_pages = (len(self.reminders) + self.max_per_page - 1) // self.max_per_page
         self.children[2].disabled = self.current_page == 0
-        self.children[3].disabled = self.current_page >= total_pages - 1
+        self.children[3].disabled = not self.has_next()
+
+    def render(self):
+        return CustomEmbed.reminder_list(self.page, self.active_only, self.current_page * self.max_per_page, self.total)
+
+    async def show(self, interaction: discord.Interaction, active_only: bool):
+        page, total = await storage.fetch_reminders_page(self.user_id, active_only, limit=self.max_per_page, count=True)
+        self.reset(page, total, active_only)
+        await interaction.message.edit(embed=self.render(), view=self)
     
     @discord.ui.button(label="Show Active", style=discord.ButtonStyle.success, custom_id="show_active", emoji="✅")
     async def show_active(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -348,12 +662,7 @@ class ReminderView(discord.ui.View):
             await interaction.response.send_message("This button is not for you!", ephemeral=True)
             return
         await interaction.response.defer()
-        self.active_only = True
-        self.reminders = await fetch_reminders(self.user_id, active_only=True)
-        self.current_page = 0
-        embed = CustomEmbed.reminder_list(self.reminders, self.active_only, self.current_page * self.max_per_page, self.max_per_page)
-        self.update_buttons()
-        await interaction.message.edit(embed=embed, view=self)
+        await self.show(interaction, active_only=True)
     
     @discord.ui.button(label="Show Archived", style=discord.ButtonStyle.secondary, custom_id="show_archived", emoji="📁")
     async def show_archived(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -361,12 +670,7 @@ class ReminderView(discord.ui.View):
             await interaction.response.send_message("This button is not for you!", ephemeral=True)
             return
         await interaction.response.defer()
-        self.active_only = False
-        self.reminders = await fetch_reminders(self.user_id, active_only=False)
-        self.current_page = 0
-        embed = CustomEmbed.reminder_list(self.reminders, self.active_only, self.current_page * self.max_per_page, self.max_per_page)
-        self.update_buttons()
-        await interaction.message.edit(embed=embed, view=self)
+        await self.show(interaction, active_only=False)
     
     @discord.ui.button(label="Previous", style=discord.ButtonStyle.gray, custom_id="prev", emoji="⬅️")
     async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -375,10 +679,17 @@ class ReminderView(discord.ui.View):
             return
         await interaction.response.defer()
         if self.current_page > 0:
+            if self._prev is None:
+                self._prev = self.prefetch(after=False)
+            rows = await self.resolve(self._prev)
+            if isinstance(self._next, asyncio.Task):
+                self._next.cancel()
+            self._next = self.page
+            self.page = rows
             self.current_page -= 1
-            embed = CustomEmbed.reminder_list(self.reminders, self.active_only, self.current_page * self.max_per_page, self.max_per_page)
+            self._prev = self.prefetch(after=False)
             self.update_buttons()
-            await interaction.message.edit(embed=embed, view=self)
+            await interaction.message.edit(embed=self.render(), view=self)
     
     @discord.ui.button(label="Next", style=discord.ButtonStyle.gray, custom_id="next", emoji="➡️")
     async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -386,71 +697,86 @@ class ReminderView(discord.ui.View):
             await interaction.response.send_message("This button is not for you!", ephemeral=True)
             return
         await interaction.response.defer()
-        total_pages = (len(self.reminders) + self.max_per_page - 1) // self.max_per_page
-        if self.current_page < total_pages - 1:
+        if self.has_next():
+            if self._next is None:
+                self._next = self.prefetch(after=True)
+            rows = await self.resolve(self._next)
+            if not rows:
+                return
+            if isinstance(self._prev, asyncio.Task):
+                self._prev.cancel()
+            self._prev = self.page
+            self.page = rows
             self.current_page += 1
-            embed = CustomEmbed.reminder_list(self.reminders, self.active_only, self.current_page * self.max_per_page, self.max_per_page)
+            self._next = self.prefetch(after=True)
             self.update_buttons()
-            await interaction.message.edit(embed=embed, view=self)
-
-class SnoozeView(discord.ui.View):
-    def __init__(self, reminder_id):
-        super().__init__(timeout=300)  # 5 minutes timeout
-        self.reminder_id = reminder_id
-
-    @discord.ui.button(label="Snooze 5m", style=discord.ButtonStyle.secondary, custom_id="snooze_5")
-    async def snooze_5(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.snooze(interaction, 5)
-
-    @discord.ui.button(label="Snooze 10m", style=discord.ButtonStyle.secondary, custom_id="snooze_10")
-    async def snooze_10(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.snooze(interaction, 10)
-
-    @discord.ui.button(label="Snooze 30m", style=discord.ButtonStyle.secondary, custom_id="snooze_30")
-    async def snooze_30(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.snooze(interaction, 30)
-
-    async def snooze(self, interaction: discord.Interaction, minutes: int):
-        user_id = str(interaction.user.id)
-        
-        # Check if the reminder exists and belongs to the user
-        reminders = await fetch_reminders(user_id, active_only=True)
-        reminder = next((r for r in reminders if r["id"] == self.reminder_id), None)
-        
-        if not reminder or reminder["user_id"] != user_id:
-            await interaction.response.send_message("This reminder isn’t yours or doesn’t exist!", ephemeral=True)
-            return
-        
-        # Update the reminder time
-        current_time = datetime.fromisoformat(reminder["reminder_time"])
-        new_time = current_time + timedelta(minutes=minutes)
-        patch_data_dict = {
-            "reminder_time": new_time.isoformat(),
-            "is_sent": False
-        }
-        status, text = await patch_data("reminders", f"id=eq.{self.reminder_id}", patch_data_dict)
-        
-        if status in (200, 204):
-            embed = discord.Embed(
-                title="💤 Reminder Snoozed!",
-                description=f"Reminder `{self.reminder_id}` has been snoozed for {minutes} minutes: **{reminder['message']}**\nNew time: {new_time.strftime('%Y-%m-%d %H:%M:%S UTC')}",
-                color=discord.Color.from_rgb(255, 255, 0)  # Yellow like JubJub's pupils
-            )
-            embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-            embed.set_footer(text="JubJub’s snoozing!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-            embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
-            await interaction.response.send_message(embed=embed)
-            # Disable the buttons after snoozing
-            for child in self.children:
-                child.disabled = True
-            await interaction.message.edit(view=self)
-        else:
-            embed = discord.Embed(
-                title="❌ Failed to Snooze",
-                description="Something went wrong while snoozing the reminder. Try again later.",
-                color=discord.Color.from_rgb(255, 0, 0)
-            )
-            embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-            embed.set_footer(text="JubJub’s sorry!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-            embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
\ No newline at end of file
+            await interaction.message.edit(embed=self.render(), view=self)
+
+# Snooze buttons carry everything they need in their custom_id ("jubjub:snooze:<id>:<minutes>"),
+# so no view object is kept per delivered reminder and buttons keep working after a restart.
+# handle_snooze_interaction is the one handler for all of them, registered in bot_setup.
+SNOOZE_PREFIX = "jubjub:snooze:"
+SNOOZE_MINUTES = (5, 10, 30)
+
+def snooze_view(reminder_ids: list, disabled: bool = False) -> discord.ui.View:
+    # One row of buttons per reminder; the reminder id is only spelled out when a message holds several
+    view = discord.ui.View(timeout=None)
+    for row, reminder_id in enumerate(reminder_ids):
+        for minutes in SNOOZE_MINUTES:
+            label = f"Snooze {minutes}m" if len(reminder_ids) == 1 else f"#{reminder_id} Snooze {minutes}m"
+            view.add_item(discord.ui.Button(
+                label=label, style=discord.ButtonStyle.secondary,
+                custom_id=f"{SNOOZE_PREFIX}{reminder_id}:{minutes}", disabled=disabled, row=row
+            ))
+    # A stopped view is never stored by discord.py, so sending it doesn't keep it alive
+    view.stop()
+    return view
+
+def disable_snooze_buttons(message: discord.Message, reminder_id: int) -> discord.ui.View:
+    # The message's buttons as they are, with only this reminder's row disabled
+    view = discord.ui.View.from_message(message, timeout=None)
+    for item in view.children:
+        parsed = parse_snooze_id(getattr(item, "custom_id", None) or "")
+        if parsed and parsed[0] == reminder_id:
+            item.disabled = True
+    view.stop()
+    return view
+
+def parse_snooze_id(custom_id: str):
+    # "jubjub:snooze:42:10" -> (42, 10), or None for anything else
+    if not custom_id.startswith(SNOOZE_PREFIX):
+        return None
+    reminder_id, _, minutes = custom_id[len(SNOOZE_PREFIX):].partition(":")
+    if not reminder_id.isdigit() or not minutes.isdigit() or int(minutes) not in SNOOZE_MINUTES:
+        return None
+    return int(reminder_id), int(minutes)
+
+async def handle_snooze_interaction(interaction: discord.Interaction):
+    if interaction.type is not discord.InteractionType.component:
+        return
+    parsed = parse_snooze_id((interaction.data or {}).get("custom_id", ""))
+    if parsed is None:
+        return
+    reminder_id, minutes = parsed
+    user_id = str(interaction.user.id)
+
+    # Only the owner can snooze; delivered one-time reminders can be snoozed too
+    reminder = await find_reminder(reminder_id, user_id, active_only=False)
+    if reminder and reminder["recurrence"] != "none":
+        snoozed = await snooze_occurrence(reminder, minutes)
+    elif reminder:
+        reminder, snoozed = await snooze_by_id(
+            reminder_id, user_id, minutes, active_only=False, from_now=True, reminder=reminder
+        )
+    if not reminder:
+        await interaction.response.send_message("This reminder isn’t yours or doesn’t exist!", ephemeral=True)
+        return
+    if snoozed:
+        new_time = datetime.fromisoformat(snoozed["reminder_time"])
+        embed = CustomEmbed.snoozed(f"Reminder `{reminder_id}` has been snoozed for {minutes} minutes: **{reminder['message']}**\nNew time: {new_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+        await interaction.response.send_message(embed=embed)
+        # Disable the buttons after snoozing
+        await interaction.message.edit(view=disable_snooze_buttons(interaction.message, reminder_id))
+    else:
+        embed = CustomEmbed.failure("Failed to Snooze", "Something went wrong while snoozing the reminder. Try again later.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -0,0 +1,57 @@
+# resolver.py
+# Cached Discord user/channel lookups for reminder delivery
+
+import time
+from collections import OrderedDict
+import discord
+from metrics import registry
+from single_flight import SingleFlight
+
+LOOKUPS = registry.counter(
+    "jubjub_discord_lookups_total", "User/channel resolutions by where the answer came from", ("kind", "source")
+)
+
+class Resolver:
+    # Resolves ids to Discord objects: the client's own cache first, then a bounded TTL + LRU
+    # cache of objects fetched over REST, and only then a fetch. Concurrent lookups of the same
+    # id (several reminders for one user in a tick) share a single fetch. Ids Discord says
+    # don't exist are cached as None so they aren't fetched again until the TTL runs out.
+    def __init__(self, kind: str, ttl_seconds: float, max_size: int):
+        self.kind = kind
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # id -> (expires_at, object or None)
+        self._fetches = SingleFlight()  # id -> fetch in progress
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def resolve(self, object_id: int, cached, fetch):
+        # cached: (id) -> object or None, from the client cache; fetch: async (id) -> object
+        found = cached(object_id)
+        if found is not None:
+            LOOKUPS.inc(kind=self.kind, source="client")
+            return found
+        entry = self._entries.get(object_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(object_id)
+                LOOKUPS.inc(kind=self.kind, source="cache")
+                return entry[1]
+            del self._entries[object_id]
+        LOOKUPS.inc(kind=self.kind, source="shared" if object_id in self._fetches else "fetch")
+        return await self._fetches.run(object_id, self._fetch, object_id, fetch)
+
+    async def _fetch(self, object_id: int, fetch):
+        try:
+            found = await fetch(object_id)
+        except discord.NotFound:
+            found = None
+        self._store(object_id, found)
+        return found
+
+    def _store(self, object_id: int, found):
+        self._entries[object_id] = (time.monotonic() + self.ttl_seconds, found)
+        self._entries.move_to_end(object_id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
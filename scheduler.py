@@ -0,0 +1,160 @@
+# scheduler.py
+# In-memory timer heap that fires reminders right at their due time
+
+import logging
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from metrics import SCHEDULER_TICK
+
+logger = logging.getLogger(__name__)
+
+class ReminderScheduler:
+    # Holds reminders due within the lookahead window in a min-heap keyed by due time.
+    # Stale heap entries are skipped lazily instead of being removed in place.
+    def __init__(self, lookahead_seconds: float, max_sleep: float = 30.0):
+        self.lookahead_seconds = lookahead_seconds
+        self.max_sleep = max_sleep  # Re-check the clock at least this often
+        self._heap = []  # (due_ts, seq, reminder_id)
+        self._entries = {}  # reminder_id -> (due_ts, seq, reminder, scheduled_at)
+        self._in_flight = set()  # Fired but not yet persisted as delivered
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._callback = None
+        self._stopping = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def due_timestamp(reminder: dict) -> float:
+        return datetime.fromisoformat(reminder["reminder_time"]).timestamp()
+
+    def horizon(self) -> float:
+        return time.time() + self.lookahead_seconds
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, callback):
+        # callback is awaited with a list of due reminder rows
+        self._callback = callback
+        if not self.is_running():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def drain(self, timeout: float) -> bool:
+        # Stop firing new batches but let the batch being delivered finish (and persist).
+        # Returns False if it had to be cancelled after timeout seconds.
+        if not self.is_running():
+            return True
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.stop()
+
+    def schedule(self, reminder: dict) -> bool:
+        reminder_id = reminder["id"]
+        due_ts = self.due_timestamp(reminder)
+        if due_ts > self.horizon():
+            # Outside the window, the reconciliation pass will pick it up later
+            self.unschedule(reminder_id)
+            return False
+        self._seq += 1
+        self._entries[reminder_id] = (due_ts, self._seq, reminder, time.monotonic())
+        heapq.heappush(self._heap, (due_ts, self._seq, reminder_id))
+        if self._heap[0][1] == self._seq:
+            self._wakeup.set()  # New earliest deadline
+        return True
+
+    def unschedule(self, reminder_id):
+        self._entries.pop(reminder_id, None)
+
+    def done(self, reminder_id):
+        self._in_flight.discard(reminder_id)
+
+    def hold(self, reminders: list) -> list:
+        # For deliveries outside the heap (catch-up): drops rows the scheduler already has and marks
+        # the rest in flight so reconciliation leaves them alone until done() is called for them
+        held = [r for r in reminders if r["id"] not in self._entries and r["id"] not in self._in_flight]
+        self._in_flight.update(r["id"] for r in held)
+        return held
+
+    def reconcile(self, reminders: list, started_at: float):
+        # Merge a fresh snapshot of reminders due before the horizon. Entries the snapshot
+        # doesn't know about are dropped unless they were scheduled after the fetch began.
+        seen = set()
+        for reminder in reminders:
+            seen.add(reminder["id"])
+            if reminder["id"] in self._in_flight:
+                continue
+            current = self._entries.get(reminder["id"])
+            if current and current[0] == self.due_timestamp(reminder):
+                continue
+            self.schedule(reminder)
+        for reminder_id, (_, _, _, scheduled_at) in list(self._entries.items()):
+            if reminder_id not in seen and scheduled_at < started_at:
+                del self._entries[reminder_id]
+        # Rebuild the heap if lazy deletions have left it mostly garbage
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(due_ts, seq, rid) for rid, (due_ts, seq, _, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> list:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_ts, seq, reminder_id = heapq.heappop(self._heap)
+            entry = self._entries.get(reminder_id)
+            if entry is None or entry[1] != seq:
+                continue  # Unscheduled or rescheduled since it was pushed
+            del self._entries[reminder_id]
+            self._in_flight.add(reminder_id)
+            due.append(entry[2])
+        return due
+
+    def _next_delay(self) -> float:
+        while self._heap:
+            due_ts, seq, reminder_id = self._heap[0]
+            entry = self._entries.get(reminder_id)
+            if entry is not None and entry[1] == seq:
+                return min(max(due_ts - time.time(), 0), self.max_sleep)
+            heapq.heappop(self._heap)
+        return self.max_sleep
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            delay = self._next_delay()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # Schedule changed, recompute the deadline
+                except asyncio.TimeoutError:
+                    pass
+            if self._stopping:
+                break
+            due = self._pop_due(time.time())
+            if not due:
+                continue
+            started_at = time.perf_counter()
+            try:
+                await self._callback(due)
+            except Exception:
+                logger.exception("Reminder scheduler callback failed", extra={"reminder_ids": [r["id"] for r in due]})
+            finally:
+                SCHEDULER_TICK.observe(time.perf_counter() - started_at, phase="fire")
+                # The callback has persisted (or given up on) these, reconciliation may see them again
+                for reminder in due:
+                    self.done(reminder["id"])
@@ -0,0 +1,33 @@
+# single_flight.py
+# Concurrent calls for the same key share one run of the underlying coroutine
+
+import asyncio
+
+class SingleFlight:
+    # The first caller for a key runs the coroutine; anyone asking for that key before it finishes
+    # awaits the same result (or exception) instead of starting another. Waiters are shielded, so
+    # one of them being cancelled doesn't cancel the run the others are waiting on.
+    def __init__(self):
+        self._pending = {}  # key -> future for a run in progress
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    async def run(self, key, fn, *args, **kwargs):
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._pending[key]
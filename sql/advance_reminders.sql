@@ -0,0 +1,42 @@
+-- advance_reminders.sql
+-- Persists delivered reminders without overwriting changes made during delivery.
+
+-- Moves delivered recurring reminders on to their next occurrence and drops the lease, called via
+-- POST /rpc/advance_reminders {"worker_id": "...", "advances": [{"id", "reminder_time", "next_time"}, ...]}
+-- Only rows the worker still holds at the reminder_time it delivered are touched, so a reminder
+-- cancelled or snoozed while it was being delivered is left alone, and nothing is ever inserted.
+
+create or replace function advance_reminders(worker_id text, advances jsonb)
+returns setof reminders
+language sql
+as $$
+    update reminders r
+    set reminder_time = a.next_time,
+        next_occurrence = a.next_time,
+        is_sent = false,
+        claimed_by = null,
+        lease_expires_at = null
+    from jsonb_to_recordset(advances) as a(id bigint, reminder_time timestamptz, next_time timestamptz)
+    where r.id = a.id
+      and r.claimed_by = advance_reminders.worker_id
+      and r.reminder_time = a.reminder_time
+    returning r.*;
+$$;
+
+-- The same rule for delivered one-time reminders, via
+-- POST /rpc/mark_reminders_sent {"worker_id": "...", "sent": [{"id", "reminder_time"}, ...]}
+-- A reminder snoozed after delivery but before this runs keeps its new time and stays unsent.
+create or replace function mark_reminders_sent(worker_id text, sent jsonb)
+returns setof reminders
+language sql
+as $$
+    update reminders r
+    set is_sent = true,
+        claimed_by = null,
+        lease_expires_at = null
+    from jsonb_to_recordset(sent) as s(id bigint, reminder_time timestamptz)
+    where r.id = s.id
+      and r.claimed_by = mark_reminders_sent.worker_id
+      and r.reminder_time = s.reminder_time
+    returning r.*;
+$$;
@@ -0,0 +1,9 @@
+-- delivery_mode.sql
+-- Per-user choice of where reminders are delivered, set with /deliverymode.
+-- 'both' (channel and DM) is the default, and is also what the bot assumes when the column is null.
+
+alter table user_preferences add column if not exists delivery_mode text;
+
+alter table user_preferences drop constraint if exists user_preferences_delivery_mode_check;
+alter table user_preferences add constraint user_preferences_delivery_mode_check
+    check (delivery_mode is null or delivery_mode in ('channel', 'dm', 'both'));
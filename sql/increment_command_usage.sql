@@ -0,0 +1,68 @@
+-- increment_command_usage.sql
+-- Atomic, batched increments for command_usage, called by the bot's write-behind usage buffer
+-- via POST /rpc/increment_command_usage {"flush_id": "...", "increments": [{"user_id", "command_name", "delta"}, ...]}
+-- Each batch carries a flush id and is applied at most once, so the bot can resend a batch whose
+-- request timed out without counting it twice.
+
+-- One row per (user, command) is required for the upsert below
+create unique index if not exists command_usage_user_command_key
+    on command_usage (user_id, command_name);
+
+-- Per-command rollup kept in step with command_usage, so /stats never has to scan it
+create table if not exists command_usage_totals (
+    command_name text primary key,
+    usage_count bigint not null default 0
+);
+
+-- Flush ids applied in the last day; a resent batch arrives within minutes
+create table if not exists command_usage_flushes (
+    flush_id text primary key,
+    applied_at timestamptz not null default now()
+);
+
+drop function if exists increment_command_usage(jsonb);
+
+create or replace function increment_command_usage(increments jsonb, flush_id text)
+returns void
+language plpgsql
+as $$
+begin
+    delete from command_usage_flushes where applied_at < now() - interval '1 day';
+    insert into command_usage_flushes (flush_id) values (increment_command_usage.flush_id)
+    on conflict do nothing;
+    if not found then
+        return;  -- Already applied by an earlier attempt
+    end if;
+
+    insert into command_usage (user_id, command_name, usage_count)
+    select i.user_id, i.command_name, sum(i.delta)
+    from jsonb_to_recordset(increments) as i(user_id text, command_name text, delta integer)
+    group by i.user_id, i.command_name
+    on conflict (user_id, command_name)
+    do update set usage_count = command_usage.usage_count + excluded.usage_count;
+
+    insert into command_usage_totals (command_name, usage_count)
+    select i.command_name, sum(i.delta)
+    from jsonb_to_recordset(increments) as i(user_id text, command_name text, delta integer)
+    group by i.command_name
+    on conflict (command_name)
+    do update set usage_count = command_usage_totals.usage_count + excluded.usage_count;
+end;
+$$;
+
+-- Rebuilds the rollup from command_usage and returns it; the bot calls this periodically
+-- via POST /rpc/reconcile_command_usage_totals to correct any drift
+create or replace function reconcile_command_usage_totals()
+returns setof command_usage_totals
+language plpgsql
+as $$
+begin
+    insert into command_usage_totals (command_name, usage_count)
+    select command_name, sum(usage_count)
+    from command_usage
+    group by command_name
+    on conflict (command_name)
+    do update set usage_count = excluded.usage_count;
+    return query select * from command_usage_totals;
+end;
+$$;
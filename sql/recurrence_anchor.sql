@@ -0,0 +1,10 @@
+-- recurrence_anchor.sql
+-- The day of month a monthly or yearly reminder was set for. reminder_time is clamped in shorter
+-- months (the 31st becomes Feb 28), so without this a month-end reminder would stay on the 28th.
+
+alter table reminders add column if not exists anchor_day smallint;
+
+-- Existing recurring reminders keep the day they are currently on
+update reminders
+set anchor_day = extract(day from reminder_time)
+where recurrence <> 'none' and anchor_day is null;
@@ -0,0 +1,12 @@
+-- reminder_leases.sql
+-- Lease columns that let several bot processes share the reminders table without double delivery.
+-- A process claims due reminders with one conditional PATCH (claimed_by + lease_expires_at) and
+-- only delivers the rows it got back; a lease that expires (crashed process) can be taken over.
+
+alter table reminders add column if not exists claimed_by text;
+alter table reminders add column if not exists lease_expires_at timestamptz;
+
+-- The reconciliation scan and the claim both look for unsent reminders by time
+create index if not exists reminders_unsent_time_idx
+    on reminders (reminder_time)
+    where is_sent = false;
@@ -0,0 +1,436 @@
+# sqlite_storage.py
+# Storage backend on a local SQLite file (WAL mode), for small deployments and offline runs
+
+import logging
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+create table if not exists reminders (
+    id integer primary key autoincrement,
+    user_id text not null,
+    channel_id text not null,
+    message text not null,
+    reminder_time text not null,
+    set_time text not null,
+    recurrence text not null default 'none',
+    recurrence_time text,
+    next_occurrence text,
+    anchor_day integer,
+    is_sent integer not null default 0,
+    claimed_by text,
+    lease_expires_at text
+);
+create index if not exists reminders_due_idx on reminders (is_sent, reminder_time);
+create index if not exists reminders_user_idx on reminders (user_id, is_sent, reminder_time, id);
+
+create table if not exists gifs (
+    id integer primary key autoincrement,
+    name text not null unique,
+    link text not null,
+    category text not null default 'general'
+);
+
+create table if not exists user_preferences (
+    user_id text primary key,
+    timezone text,
+    delivery_mode text
+);
+
+create table if not exists command_usage (
+    user_id text not null,
+    command_name text not null,
+    usage_count integer not null default 0,
+    primary key (user_id, command_name)
+);
+create index if not exists command_usage_user_idx on command_usage (user_id);
+
+create table if not exists command_usage_totals (
+    command_name text primary key,
+    usage_count integer not null default 0
+);
+
+create table if not exists command_usage_flushes (
+    flush_id text primary key,
+    applied_at text not null
+);
+"""
+
+REMINDER_COLUMNS = (
+    "user_id", "channel_id", "message", "reminder_time", "set_time",
+    "recurrence", "recurrence_time", "next_occurrence", "anchor_day", "is_sent", "claimed_by", "lease_expires_at"
+)
+TIMESTAMP_COLUMNS = ("reminder_time", "set_time", "next_occurrence", "lease_expires_at")
+# Columns added after the first release, created on databases that predate them
+MIGRATIONS = {
+    "reminders": (("claimed_by", "text"), ("lease_expires_at", "text"), ("anchor_day", "integer")),
+    "user_preferences": (("delivery_mode", "text"),),
+}
+
+def _timestamp(value):
+    # Stored as fixed-width UTC ISO strings so text comparison orders them correctly
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+def _encode_reminder(values: dict) -> dict:
+    encoded = {}
+    for key, value in values.items():
+        if key in TIMESTAMP_COLUMNS:
+            value = _timestamp(value)
+        elif key == "is_sent":
+            value = int(bool(value))
+        encoded[key] = value
+    return encoded
+
+def _decode_reminder(row) -> dict:
+    reminder = dict(row)
+    reminder["is_sent"] = bool(reminder["is_sent"])
+    return reminder
+
+class SQLiteStorage(Storage):
+    # One connection used from one worker thread: every query runs off the event loop,
+    # and serialising them there is what SQLite wants for writes anyway.
+    name = "SQLite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._columns = {}  # table -> set of column names, for validating dynamic keys
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conn.executescript(SCHEMA)
+            for table, columns in MIGRATIONS.items():
+                existing = {row["name"] for row in conn.execute(f"pragma table_info({table})")}
+                for column, column_type in columns:
+                    if column not in existing:
+                        conn.execute(f"alter table {table} add column {column} {column_type}")
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        def call():
+            return fn(self._connect(), *args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def _write(self, action: str, fn, *args) -> bool:
+        try:
+            await self._run(fn, *args)
+            return True
+        except sqlite3.Error as e:
+            logger.error("Failed to %s: %s", action, e)
+            return False
+
+    def _table_columns(self, conn, table: str) -> set:
+        if table not in self._columns:
+            self._columns[table] = {row["name"] for row in conn.execute(f"pragma table_info({table})")}
+        return self._columns[table]
+
+    async def open(self):
+        await self._run(lambda conn: None)
+
+    async def close(self):
+        def close(conn):
+            conn.close()
+            self._conn = None
+        if self._conn is not None:
+            await self._run(close)
+
+    async def ping(self):
+        await self._run(lambda conn: conn.execute("select 1").fetchone())
+
+    # Reminders
+    async def create_reminder(self, reminder: dict):
+        def insert(conn):
+            values = _encode_reminder({key: reminder.get(key) for key in REMINDER_COLUMNS})
+            values["recurrence"] = values["recurrence"] or "none"
+            values["is_sent"] = values["is_sent"] or 0
+            with conn:
+                cursor = conn.execute(
+                    f"insert into reminders ({', '.join(values)}) values ({', '.join('?' * len(values))})",
+                    tuple(values.values())
+                )
+            row = conn.execute("select * from reminders where id = ?", (cursor.lastrowid,)).fetchone()
+            return _decode_reminder(row)
+        try:
+            return await self._run(insert)
+        except sqlite3.Error as e:
+            logger.error("Failed to create reminder: %s", e, extra={"user_id": reminder.get("user_id")})
+            return None
+
+    async def fetch_reminder(self, reminder_id: int, user_id: str, active_only: bool = False):
+        def select(conn):
+            row = conn.execute(
+                "select * from reminders where id = ? and user_id = ?" + (" and is_sent = 0" if active_only else ""),
+                (reminder_id, str(user_id))
+            ).fetchone()
+            return _decode_reminder(row) if row else None
+        return await self._run(select)
+
+    async def fetch_reminders_page(self, user_id: str, active_only: bool = True, after: tuple = None,
+                                   before: tuple = None, limit: int = 10, count: bool = False):
+        def select(conn):
+            where = "user_id = ? and is_sent = ?"
+            params = [str(user_id), int(not active_only)]
+            total = conn.execute(f"select count(*) from reminders where {where}", params).fetchone()[0] if count else None
+            if after:
+                where += " and (reminder_time, id) > (?, ?)"
+                params += [_timestamp(after[0]), after[1]]
+            elif before:
+                where += " and (reminder_time, id) < (?, ?)"
+                params += [_timestamp(before[0]), before[1]]
+            order = "reminder_time desc, id desc" if before else "reminder_time, id"
+            rows = [
+                _decode_reminder(row)
+                for row in conn.execute(f"select * from reminders where {where} order by {order} limit ?", params + [limit])
+            ]
+            if before:
+                rows.reverse()
+            return rows, total
+        return await self._run(select)
+
+    async def fetch_due_reminders(self, until: datetime = None, worker_id: str = None) -> list:
+        def select(conn):
+            sql = "select * from reminders where is_sent = 0 and reminder_time < ?"
+            params = [_timestamp(until or datetime.now(timezone.utc))]
+            if worker_id:
+                sql += " and (lease_expires_at is null or lease_expires_at < ? or claimed_by = ?)"
+                params += [_timestamp(datetime.now(timezone.utc)), worker_id]
+            rows = conn.execute(sql + " order by reminder_time", params)
+            return [_decode_reminder(row) for row in rows]
+        return await self._run(select)
+
+    async def fetch_due_reminders_page(self, until: datetime = None, worker_id: str = None, after: tuple = None,
+                                       limit: int = 100, count: bool = False):
+        def select(conn):
+            where = "is_sent = 0 and reminder_time < ?"
+            params = [_timestamp(until or datetime.now(timezone.utc))]
+            if worker_id:
+                where += " and (lease_expires_at is null or lease_expires_at < ? or claimed_by = ?)"
+                params += [_timestamp(datetime.now(timezone.utc)), worker_id]
+            total = conn.execute(f"select count(*) from reminders where {where}", params).fetchone()[0] if count else None
+            if after:
+                where += " and (reminder_time, id) > (?, ?)"
+                params += [_timestamp(after[0]), after[1]]
+            rows = conn.execute(f"select * from reminders where {where} order by reminder_time, id limit ?", params + [limit])
+            return [_decode_reminder(row) for row in rows], total
+        return await self._run(select)
+
+    async def claim_reminders(self, reminder_ids: list, worker_id: str, lease_seconds: float) -> list:
+        # A single UPDATE ... RETURNING; SQLite serialises writers, so two processes sharing the
+        # file can't both claim a row
+        def claim(conn):
+            now = datetime.now(timezone.utc)
+            with conn:
+                rows = conn.execute(
+                    f"update reminders set claimed_by = ?, lease_expires_at = ? "
+                    f"where id in ({', '.join('?' * len(reminder_ids))}) and is_sent = 0 and reminder_time <= ? "
+                    f"and (lease_expires_at is null or lease_expires_at < ? or claimed_by = ?) returning *",
+                    (worker_id, _timestamp(now + timedelta(seconds=lease_seconds)), *reminder_ids,
+                     _timestamp(now), _timestamp(now), worker_id)
+                ).fetchall()
+            return [_decode_reminder(row) for row in rows]
+        try:
+            return await self._run(claim)
+        except sqlite3.Error as e:
+            logger.error("Failed to claim %d reminder(s): %s", len(reminder_ids), e)
+            return []
+
+    async def release_reminders(self, reminder_ids: list, worker_id: str) -> bool:
+        def release(conn):
+            with conn:
+                conn.execute(
+                    f"update reminders set claimed_by = null, lease_expires_at = null "
+                    f"where id in ({', '.join('?' * len(reminder_ids))}) and claimed_by = ?",
+                    (*reminder_ids, worker_id)
+                )
+        return await self._write(f"release {len(reminder_ids)} reminder(s)", release)
+
+    def _match(self, expected: dict):
+        # expected column values as a where clause; None means "is null"
+        encoded = _encode_reminder({key: expected[key] for key in expected if key in REMINDER_COLUMNS})
+        clause = "".join(f" and {key} is null" if value is None else f" and {key} = ?" for key, value in encoded.items())
+        return clause, [value for value in encoded.values() if value is not None]
+
+    async def update_reminder_if(self, reminder_id: int, user_id: str, values: dict, expected: dict):
+        def update(conn):
+            encoded = _encode_reminder({key: values[key] for key in values if key in REMINDER_COLUMNS})
+            assignments = ", ".join(f"{key} = ?" for key in encoded)
+            clause, params = self._match(expected)
+            with conn:
+                row = conn.execute(
+                    f"update reminders set {assignments} where id = ? and user_id = ?{clause} returning *",
+                    (*encoded.values(), reminder_id, str(user_id), *params)
+                ).fetchone()
+            return _decode_reminder(row) if row else None
+        try:
+            return await self._run(update)
+        except sqlite3.Error as e:
+            logger.error("Failed to update reminder: %s", e, extra={"reminder_id": reminder_id, "user_id": user_id})
+            return None
+
+    async def delete_reminder_if(self, reminder_id: int, user_id: str, expected: dict):
+        def delete(conn):
+            clause, params = self._match(expected)
+            with conn:
+                row = conn.execute(
+                    f"delete from reminders where id = ? and user_id = ?{clause} returning *",
+                    (reminder_id, str(user_id), *params)
+                ).fetchone()
+            return _decode_reminder(row) if row else None
+        try:
+            return await self._run(delete)
+        except sqlite3.Error as e:
+            logger.error("Failed to delete reminder: %s", e, extra={"reminder_id": reminder_id, "user_id": user_id})
+            return None
+
+    async def mark_reminders_sent(self, sent: list, worker_id: str) -> list:
+        def update(conn):
+            marked = []
+            with conn:
+                for item in sent:
+                    row = conn.execute(
+                        "update reminders set is_sent = 1, claimed_by = null, lease_expires_at = null "
+                        "where id = ? and claimed_by = ? and reminder_time = ? returning id",
+                        (item["id"], worker_id, _timestamp(item["reminder_time"]))
+                    ).fetchone()
+                    if row:
+                        marked.append(row["id"])
+            return marked
+        try:
+            return await self._run(update)
+        except sqlite3.Error as e:
+            logger.error("Failed to mark %d reminder(s) as sent: %s", len(sent), e)
+            return []
+
+    async def advance_reminders(self, advances: list, worker_id: str) -> list:
+        def advance(conn):
+            rows = []
+            with conn:
+                for item in advances:
+                    next_time = _timestamp(item["next_time"])
+                    row = conn.execute(
+                        "update reminders set reminder_time = ?, next_occurrence = ?, is_sent = 0, "
+                        "claimed_by = null, lease_expires_at = null "
+                        "where id = ? and claimed_by = ? and reminder_time = ? returning *",
+                        (next_time, next_time, item["id"], worker_id, _timestamp(item["reminder_time"]))
+                    ).fetchone()
+                    if row:
+                        rows.append(_decode_reminder(row))
+            return rows
+        try:
+            return await self._run(advance)
+        except sqlite3.Error as e:
+            logger.error("Failed to advance %d recurring reminder(s): %s", len(advances), e)
+            return []
+
+    # GIFs
+    async def fetch_gifs(self) -> list:
+        def select(conn):
+            return [dict(row) for row in conn.execute("select name, link, category from gifs")]
+        return await self._run(select)
+
+    async def add_gif(self, gif: dict) -> bool:
+        def insert(conn):
+            with conn:
+                conn.execute(
+                    "insert into gifs (name, link, category) values (?, ?, ?)",
+                    (gif["name"], gif["link"], gif.get("category") or "general")
+                )
+        return await self._write(f"add GIF {gif['name']}", insert)
+
+    # User preferences
+    async def fetch_user_preferences(self, user_id: str):
+        def select(conn):
+            row = conn.execute("select * from user_preferences where user_id = ?", (str(user_id),)).fetchone()
+            return dict(row) if row else None
+        return await self._run(select)
+
+    async def fetch_user_preferences_many(self, user_ids: list) -> list:
+        def select(conn):
+            rows = []
+            # SQLite caps bound parameters per statement
+            for i in range(0, len(user_ids), 500):
+                chunk = [str(user_id) for user_id in user_ids[i:i + 500]]
+                rows += conn.execute(
+                    f"select * from user_preferences where user_id in ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            return [dict(row) for row in rows]
+        return await self._run(select)
+
+    async def upsert_user_preferences(self, user_id: str, values: dict) -> bool:
+        def upsert(conn):
+            unknown = set(values) - self._table_columns(conn, "user_preferences")
+            if unknown:
+                raise sqlite3.OperationalError(f"unknown preference column(s): {', '.join(sorted(unknown))}")
+            columns = ["user_id", *values]
+            updates = ", ".join(f"{column} = excluded.{column}" for column in values) or "user_id = excluded.user_id"
+            with conn:
+                conn.execute(
+                    f"insert into user_preferences ({', '.join(columns)}) values ({', '.join('?' * len(columns))}) "
+                    f"on conflict (user_id) do update set {updates}",
+                    (str(user_id), *values.values())
+                )
+        return await self._write(f"save preferences for user {user_id}", upsert)
+
+    # Command usage counters, mirroring sql/increment_command_usage.sql
+    async def increment_command_usage(self, increments: list, flush_id: str) -> bool:
+        def increment(conn):
+            totals = {}
+            for item in increments:
+                totals[item["command_name"]] = totals.get(item["command_name"], 0) + item["delta"]
+            now = datetime.now(timezone.utc)
+            with conn:
+                conn.execute("delete from command_usage_flushes where applied_at < ?", (_timestamp(now - timedelta(days=1)),))
+                applied = conn.execute(
+                    "insert into command_usage_flushes (flush_id, applied_at) values (?, ?) on conflict do nothing",
+                    (flush_id, _timestamp(now))
+                ).rowcount
+                if not applied:
+                    return  # Already applied by an earlier attempt
+                conn.executemany(
+                    "insert into command_usage (user_id, command_name, usage_count) values (?, ?, ?) "
+                    "on conflict (user_id, command_name) do update set usage_count = usage_count + excluded.usage_count",
+                    [(item["user_id"], item["command_name"], item["delta"]) for item in increments]
+                )
+                conn.executemany(
+                    "insert into command_usage_totals (command_name, usage_count) values (?, ?) "
+                    "on conflict (command_name) do update set usage_count = usage_count + excluded.usage_count",
+                    list(totals.items())
+                )
+        return await self._write(f"flush command usage ({len(increments)} counters)", increment)
+
+    async def reconcile_command_usage_totals(self):
+        def reconcile(conn):
+            with conn:
+                conn.execute(
+                    "insert into command_usage_totals (command_name, usage_count) "
+                    "select command_name, sum(usage_count) from command_usage where true group by command_name "
+                    "on conflict (command_name) do update set usage_count = excluded.usage_count"
+                )
+            return [dict(row) for row in conn.execute("select command_name, usage_count from command_usage_totals")]
+        try:
+            return await self._run(reconcile)
+        except sqlite3.Error as e:
+            logger.error("Failed to reconcile command usage totals: %s", e)
+            return None
+
+    async def fetch_command_usage(self, user_id: str) -> list:
+        def select(conn):
+            return [dict(row) for row in conn.execute("select * from command_usage where user_id = ?", (str(user_id),))]
+        return await self._run(select)
@@ -0,0 +1,47 @@
+# stats.py
+# Incrementally maintained command usage rollups for /stats
+
+from collections import OrderedDict
+
+class StatsRollup:
+    # Global and per-command totals plus an LRU of per-user breakdowns, all bumped in place
+    # as commands run. Supabase keeps the persisted rollup (command_usage_totals); load_totals
+    # replaces the in-memory numbers with it during reconciliation.
+    def __init__(self, user_cache_size: int):
+        self.user_cache_size = user_cache_size
+        self.total = 0
+        self.by_command = {}  # command_name -> count
+        self._users = OrderedDict()  # user_id -> {command_name: count}
+        self.loaded = False
+
+    def record(self, user_id: str, command_name: str, amount: int = 1):
+        self.total += amount
+        self.by_command[command_name] = self.by_command.get(command_name, 0) + amount
+        user = self._users.get(user_id)
+        if user is not None:
+            user[command_name] = user.get(command_name, 0) + amount
+
+    def load_totals(self, rows: list, pending: dict):
+        # rows: persisted per-command totals; pending: {(user_id, command_name): delta} not yet flushed
+        by_command = {row["command_name"]: row["usage_count"] for row in rows}
+        for (_, command_name), delta in pending.items():
+            by_command[command_name] = by_command.get(command_name, 0) + delta
+        self.by_command = by_command
+        self.total = sum(by_command.values())
+        self.loaded = True
+
+    def get_user(self, user_id: str):
+        user = self._users.get(user_id)
+        if user is not None:
+            self._users.move_to_end(user_id)
+        return user
+
+    def load_user(self, user_id: str, rows: list, pending: dict) -> dict:
+        user = {row["command_name"]: row["usage_count"] for row in rows}
+        for (pending_user, command_name), delta in pending.items():
+            if pending_user == user_id:
+                user[command_name] = user.get(command_name, 0) + delta
+        self._users[user_id] = user
+        if len(self._users) > self.user_cache_size:
+            self._users.popitem(last=False)
+        return user
@@ -0,0 +1,125 @@
+# storage.py
+# Storage interface for everything the bot persists, and the configured backend instance
+
+from config import STORAGE_BACKEND, SQLITE_PATH
+
+class Storage:
+    # Reads return rows as dicts with timestamps as ISO strings, writes return True on success.
+    # Backends log their own failures. Implementations: SupabaseStorage (supabase_storage.py)
+    # and SQLiteStorage (sqlite_storage.py).
+    name = "Storage"
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def ping(self):
+        # The cheapest possible round trip, used by /ping
+        raise NotImplementedError
+
+    # Reminders
+    async def create_reminder(self, reminder: dict):
+        # Returns the stored row (with its id), or None
+        raise NotImplementedError
+
+    async def fetch_reminder(self, reminder_id: int, user_id: str, active_only: bool = False):
+        # Point lookup by id and owner, or None
+        raise NotImplementedError
+
+    async def fetch_reminders_page(self, user_id: str, active_only: bool = True, after: tuple = None,
+                                   before: tuple = None, limit: int = 10, count: bool = False):
+        # Keyset pagination on (reminder_time, id): after/before are the keys of the row the page
+        # should start after or end before. Returns (rows in ascending order, total or None).
+        raise NotImplementedError
+
+    async def fetch_due_reminders(self, until=None, worker_id: str = None) -> list:
+        # Unsent reminders due before until (default now), oldest first. With worker_id, rows
+        # under another worker's unexpired lease are left out.
+        raise NotImplementedError
+
+    async def fetch_due_reminders_page(self, until=None, worker_id: str = None, after: tuple = None,
+                                       limit: int = 100, count: bool = False):
+        # fetch_due_reminders one bounded page at a time, ordered by (reminder_time, id) and
+        # starting after the key `after`. Returns (rows, total due or None).
+        raise NotImplementedError
+
+    async def claim_reminders(self, reminder_ids: list, worker_id: str, lease_seconds: float) -> list:
+        # Atomically lease the given reminders to worker_id if they are due, unsent and not leased
+        # by anyone else (expired leases can be taken over). Returns only the rows this worker got.
+        raise NotImplementedError
+
+    async def release_reminders(self, reminder_ids: list, worker_id: str) -> bool:
+        # Drop this worker's lease so the reminders can be retried
+        raise NotImplementedError
+
+    async def update_reminder_if(self, reminder_id: int, user_id: str, values: dict, expected: dict):
+        # Conditional update: applies values only if the owner's row still has the expected column
+        # values, in one round trip. Returns the updated row, or None if nothing matched (or on error).
+        raise NotImplementedError
+
+    async def delete_reminder_if(self, reminder_id: int, user_id: str, expected: dict):
+        # Conditional delete, same rules as update_reminder_if; returns the deleted row or None
+        raise NotImplementedError
+
+    async def mark_reminders_sent(self, sent: list, worker_id: str) -> list:
+        # sent: [{"id", "reminder_time"}] for delivered one-time reminders. Marks them sent and drops
+        # the lease, under the same conditions as advance_reminders. Returns the ids that were marked.
+        raise NotImplementedError
+
+    async def advance_reminders(self, advances: list, worker_id: str) -> list:
+        # advances: [{"id", "reminder_time", "next_time"}] for delivered recurring reminders. Moves
+        # each row to next_time and drops the lease, but only while worker_id still holds it and
+        # reminder_time is unchanged, so a cancel or snooze during delivery wins. Never inserts.
+        # Returns the rows that were advanced.
+        raise NotImplementedError
+
+    # GIFs
+    async def fetch_gifs(self) -> list:
+        raise NotImplementedError
+
+    async def add_gif(self, gif: dict) -> bool:
+        raise NotImplementedError
+
+    # User preferences
+    async def fetch_user_preferences(self, user_id: str):
+        # The user's row, or None if they have never set anything
+        raise NotImplementedError
+
+    async def fetch_user_preferences_many(self, user_ids: list) -> list:
+        # Rows for whichever of these users have one
+        raise NotImplementedError
+
+    async def upsert_user_preferences(self, user_id: str, values: dict) -> bool:
+        raise NotImplementedError
+
+    # Command usage counters
+    async def increment_command_usage(self, increments: list, flush_id: str) -> bool:
+        # increments: [{"user_id", "command_name", "delta"}], applied atomically and at most once
+        # per flush_id, so a batch resent after a timeout isn't counted twice
+        raise NotImplementedError
+
+    async def reconcile_command_usage_totals(self):
+        # Rebuilds the per-command totals from the per-user counters and returns them, or None
+        raise NotImplementedError
+
+    async def fetch_command_usage(self, user_id: str) -> list:
+        raise NotImplementedError
+
+def get_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    if backend == "supabase":
+        from supabase_storage import SupabaseStorage
+        return SupabaseStorage()
+    if backend == "sqlite":
+        from sqlite_storage import SQLiteStorage
+        return SQLiteStorage(SQLITE_PATH)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend!r} (expected 'supabase' or 'sqlite')")
+
+def __getattr__(name: str):
+    # `from storage import storage` builds the configured backend on first use rather than at
+    # import time, so the backend modules can import Storage from here in any order
+    if name == "storage":
+        globals()["storage"] = get_storage()
+        return globals()["storage"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,201 @@
+# supabase_storage.py
+# Storage backend on the Supabase REST API (PostgREST)
+
+import logging
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+from storage import Storage
+from database import (
+    open_session, close_session, fetch_data, fetch_page, post_data, patch_data, upsert_data, delete_data
+)
+
+logger = logging.getLogger(__name__)
+
+def _ok(status, text, action: str, expected=(200, 201, 204)) -> bool:
+    if status in expected:
+        return True
+    logger.error("Failed to %s", action, extra={"status": status, "response": text})
+    return False
+
+def _match(expected: dict) -> str:
+    # expected column values as PostgREST eq filters (timestamps keep their offset via quoting)
+    filters = ""
+    for column, value in expected.items():
+        if value is None:
+            filters += f"&{column}=is.null"
+        elif isinstance(value, bool):
+            filters += f"&{column}=is.{str(value).lower()}"
+        else:
+            filters += f"&{column}=eq.{quote(str(value))}"
+    return filters
+
+def _claimable(now: datetime, worker_id: str) -> str:
+    # PostgREST or=(...) filter: not leased, lease expired, or leased by this worker
+    return f'(lease_expires_at.is.null,lease_expires_at.lt."{now.isoformat()}",claimed_by.eq."{worker_id}")'
+
+class SupabaseStorage(Storage):
+    name = "Supabase"
+
+    async def open(self):
+        await open_session()
+
+    async def close(self):
+        await close_session()
+
+    async def ping(self):
+        await fetch_data("command_usage", "?limit=1")
+
+    # Reminders
+    async def create_reminder(self, reminder: dict):
+        status, text = await post_data("reminders", reminder, returning=True)
+        if not _ok(status, text, "create reminder", (201,)):
+            return None
+        return json.loads(text)[0]
+
+    async def fetch_reminder(self, reminder_id: int, user_id: str, active_only: bool = False):
+        active_filter = "&is_sent=eq.false" if active_only else ""
+        reminders = await fetch_data("reminders", f"?id=eq.{reminder_id}&user_id=eq.{user_id}{active_filter}&limit=1")
+        return reminders[0] if reminders else None
+
+    async def fetch_reminders_page(self, user_id: str, active_only: bool = True, after: tuple = None,
+                                   before: tuple = None, limit: int = 10, count: bool = False):
+        is_sent_filter = "is_sent=eq.false" if active_only else "is_sent=eq.true"
+        filters = f"?user_id=eq.{user_id}&{is_sent_filter}"
+        if after:
+            reminder_time, reminder_id = after
+            keyset = f'(reminder_time.gt."{reminder_time}",and(reminder_time.eq."{reminder_time}",id.gt.{reminder_id}))'
+            filters += f"&or={quote(keyset)}"
+        elif before:
+            reminder_time, reminder_id = before
+            keyset = f'(reminder_time.lt."{reminder_time}",and(reminder_time.eq."{reminder_time}",id.lt.{reminder_id}))'
+            filters += f"&or={quote(keyset)}"
+        order = "reminder_time.desc,id.desc" if before else "reminder_time.asc,id.asc"
+        filters += f"&order={order}&limit={limit}"
+        rows, total = await fetch_page("reminders", filters, count)
+        if before:
+            rows.reverse()
+        return rows, total
+
+    async def fetch_due_reminders(self, until: datetime = None, worker_id: str = None) -> list:
+        current_time = (until or datetime.now(timezone.utc)).strftime("%Y-%m-%d %H:%M:%S+00")
+        encoded_time = quote(current_time)
+        filters = f"?is_sent=eq.false&reminder_time=lt.{encoded_time}&order=reminder_time.asc"
+        if worker_id:
+            filters += f"&or={quote(_claimable(datetime.now(timezone.utc), worker_id))}"
+        return await fetch_data("reminders", filters)
+
+    async def fetch_due_reminders_page(self, until: datetime = None, worker_id: str = None, after: tuple = None,
+                                       limit: int = 100, count: bool = False):
+        current_time = (until or datetime.now(timezone.utc)).isoformat()
+        filters = f"?is_sent=eq.false&reminder_time=lt.{quote(current_time)}"
+        conditions = []
+        if worker_id:
+            conditions.append("or" + _claimable(datetime.now(timezone.utc), worker_id))
+        if after:
+            reminder_time, reminder_id = after
+            conditions.append(f'or(reminder_time.gt."{reminder_time}",and(reminder_time.eq."{reminder_time}",id.gt.{reminder_id}))')
+        if conditions:
+            filters += f"&and={quote('(' + ','.join(conditions) + ')')}"
+        filters += f"&order=reminder_time.asc,id.asc&limit={limit}"
+        return await fetch_page("reminders", filters, count=count)
+
+    async def claim_reminders(self, reminder_ids: list, worker_id: str, lease_seconds: float) -> list:
+        # One conditional UPDATE: Postgres re-checks the lease condition on rows a concurrent
+        # claim just locked, so each reminder goes to exactly one worker. Re-claiming our own
+        # lease is allowed, which keeps a retried request harmless.
+        now = datetime.now(timezone.utc)
+        ids = ",".join(str(reminder_id) for reminder_id in reminder_ids)
+        filters = (
+            f"id=in.({ids})&is_sent=eq.false&reminder_time=lte.{quote(now.isoformat())}"
+            f"&or={quote(_claimable(now, worker_id))}"
+        )
+        lease = {"claimed_by": worker_id, "lease_expires_at": (now + timedelta(seconds=lease_seconds)).isoformat()}
+        status, text = await patch_data("reminders", filters, lease, returning=True)
+        if not _ok(status, text, f"claim {len(reminder_ids)} reminder(s)", (200,)):
+            return []
+        return json.loads(text)
+
+    async def release_reminders(self, reminder_ids: list, worker_id: str) -> bool:
+        ids = ",".join(str(reminder_id) for reminder_id in reminder_ids)
+        status, text = await patch_data(
+            "reminders", f"id=in.({ids})&claimed_by=eq.{quote(worker_id)}", {"claimed_by": None, "lease_expires_at": None}
+        )
+        return _ok(status, text, f"release {len(reminder_ids)} reminder(s)")
+
+    async def update_reminder_if(self, reminder_id: int, user_id: str, values: dict, expected: dict):
+        status, text = await patch_data(
+            "reminders", f"id=eq.{reminder_id}&user_id=eq.{user_id}{_match(expected)}", values, returning=True,
+            idempotent=False
+        )
+        if not _ok(status, text, f"update reminder {reminder_id}"):
+            return None
+        rows = json.loads(text)
+        return rows[0] if rows else None
+
+    async def delete_reminder_if(self, reminder_id: int, user_id: str, expected: dict):
+        status, text = await delete_data(
+            "reminders", f"id=eq.{reminder_id}&user_id=eq.{user_id}{_match(expected)}", returning=True,
+            idempotent=False
+        )
+        if not _ok(status, text, f"delete reminder {reminder_id}"):
+            return None
+        rows = json.loads(text)
+        return rows[0] if rows else None
+
+    async def mark_reminders_sent(self, sent: list, worker_id: str) -> list:
+        # One conditional UPDATE for every one-time reminder delivered in a tick (see sql/advance_reminders.sql)
+        status, text = await post_data("rpc/mark_reminders_sent", {"sent": sent, "worker_id": worker_id})
+        if not _ok(status, text, f"mark {len(sent)} reminder(s) as sent", (200,)):
+            return []
+        return [row["id"] for row in json.loads(text)]
+
+    async def advance_reminders(self, advances: list, worker_id: str) -> list:
+        # One conditional UPDATE for the whole batch (see sql/advance_reminders.sql)
+        status, text = await post_data("rpc/advance_reminders", {"advances": advances, "worker_id": worker_id})
+        if not _ok(status, text, f"advance {len(advances)} recurring reminder(s)", (200,)):
+            return []
+        return json.loads(text)
+
+    # GIFs
+    async def fetch_gifs(self) -> list:
+        return await fetch_data("gifs", "?select=name,link,category")
+
+    async def add_gif(self, gif: dict) -> bool:
+        status, text = await post_data("gifs", gif)
+        return _ok(status, text, f"add GIF {gif['name']}", (201,))
+
+    # User preferences
+    async def fetch_user_preferences(self, user_id: str):
+        preferences = await fetch_data("user_preferences", f"?user_id=eq.{user_id}")
+        return preferences[0] if preferences else None
+
+    async def fetch_user_preferences_many(self, user_ids: list) -> list:
+        # Chunked so the id list stays well inside URL length limits
+        chunks = await asyncio.gather(*(
+            fetch_data("user_preferences", f"?user_id=in.({','.join(str(u) for u in user_ids[i:i + 100])})")
+            for i in range(0, len(user_ids), 100)
+        ))
+        return [row for chunk in chunks for row in chunk]
+
+    async def upsert_user_preferences(self, user_id: str, values: dict) -> bool:
+        status, text = await upsert_data("user_preferences?on_conflict=user_id", [{"user_id": user_id, **values}])
+        return _ok(status, text, f"save preferences for user {user_id}")
+
+    # Command usage counters (see sql/increment_command_usage.sql)
+    async def increment_command_usage(self, increments: list, flush_id: str) -> bool:
+        # Deduplicated on flush_id server-side, so safe to retry
+        status, text = await post_data(
+            "rpc/increment_command_usage", {"increments": increments, "flush_id": flush_id}, idempotent=True
+        )
+        return _ok(status, text, f"flush command usage ({len(increments)} counters)", (200, 204))
+
+    async def reconcile_command_usage_totals(self):
+        status, text = await post_data("rpc/reconcile_command_usage_totals", {}, idempotent=True)
+        if not _ok(status, text, "reconcile command usage totals", (200,)):
+            return None
+        return json.loads(text)
+
+    async def fetch_command_usage(self, user_id: str) -> list:
+        return await fetch_data("command_usage", f"?user_id=eq.{user_id}")
@@ -0,0 +1,160 @@
+# time_parser.py
+# Shared parser for reminder times: durations, clock times and absolute dates
+
+import re
+from datetime import datetime, timedelta, timezone
+
+UNIT_SECONDS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+MAX_DURATION_SECONDS = 100 * 365 * 86400  # Anything longer can't be turned into a datetime safely
+
+# Grammar, compiled once at import
+_UNIT_RE = re.compile(
+    r"(\d+)\s*(w(?:eeks?|ks?)?|d(?:ays?)?|h(?:ours?|rs?)?|m(?:in(?:ute)?s?)?|s(?:ec(?:ond)?s?)?)(?![a-z])",
+    re.IGNORECASE
+)
+_SEPARATOR_RE = re.compile(r"\s*(?:,\s*|and\s+)?", re.IGNORECASE)
+_CLOCK_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m\.?(?![\w:])|(\d{1,2}):(\d{2})(?![\w:])", re.IGNORECASE)
+_DAY_RE = re.compile(
+    r"(today|tonight|tomorrow|tmrw?|mon(?:day)?|tue(?:s|sday)?|wed(?:s|nesday)?|thu(?:rs?|rsday)?|"
+    r"fri(?:day)?|sat(?:urday)?|sun(?:day)?)(?!\w)(?:\s+(?:at\s+)?)?",
+    re.IGNORECASE
+)
+_ISO_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?(?:Z|[+-]\d{2}:?\d{2})?(?![\w:])",
+    re.IGNORECASE
+)
+_LEAD_RE = re.compile(r"\s*(?:(?:in|at|on)\s+)?", re.IGNORECASE)
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DEFAULT_HOUR = 9  # "tomorrow" with no time means 09:00
+TONIGHT_HOUR = 20
+
+class ParsedTime:
+    # kind is "duration" (seconds), "clock" (hour/minute, next occurrence) or "absolute" (when).
+    # message is whatever text follows the time expression.
+    __slots__ = ("kind", "seconds", "hour", "minute", "when", "tz", "end", "message")
+
+    def __init__(self, kind: str, seconds: int = 0, hour: int = None, minute: int = None,
+                 when: datetime = None, tz=timezone.utc, end: int = 0, message: str = ""):
+        self.kind = kind
+        self.seconds = seconds
+        self.hour = hour
+        self.minute = minute
+        self.when = when
+        self.tz = tz
+        self.end = end
+        self.message = message
+
+    def __repr__(self):
+        return (f"ParsedTime(kind={self.kind!r}, seconds={self.seconds}, hour={self.hour}, "
+                f"minute={self.minute}, when={self.when!r}, message={self.message!r})")
+
+    def resolve(self, now: datetime = None) -> datetime:
+        # The UTC datetime this expression points at
+        now = now or datetime.now(timezone.utc)
+        if self.kind == "duration":
+            return now + timedelta(seconds=self.seconds)
+        if self.kind == "clock":
+            local_now = now.astimezone(self.tz)
+            target = local_now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+            if target <= local_now:
+                target += timedelta(days=1)
+            return target.astimezone(timezone.utc)
+        return self.when.astimezone(timezone.utc)
+
+    def delay_seconds(self, now: datetime = None) -> int:
+        now = now or datetime.now(timezone.utc)
+        if self.kind == "duration":
+            return self.seconds
+        return int(round((self.resolve(now) - now).total_seconds()))
+
+def duration_from_units(days: int = 0, hours: int = 0, minutes: int = 0, seconds: int = 0, weeks: int = 0) -> ParsedTime:
+    total = weeks * UNIT_SECONDS["w"] + days * UNIT_SECONDS["d"] + hours * UNIT_SECONDS["h"] + minutes * UNIT_SECONDS["m"] + seconds
+    return ParsedTime("duration", seconds=total)
+
+def _clock_from_match(match):
+    if match.group(4) is not None:
+        hour, minute = int(match.group(4)), int(match.group(5))
+    else:
+        hour = int(match.group(1))
+        minute = int(match.group(2) or 0)
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match.group(3).lower() == "p" else 0)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+    return hour, minute
+
+def parse_clock(text: str):
+    # "07:00", "7:30pm", "7am" -> (hour, minute), or None
+    match = _CLOCK_RE.fullmatch(text.strip())
+    return _clock_from_match(match) if match else None
+
+def parse_duration(text: str, pos: int = 0):
+    # Compound durations like "1h30m", "2d 5s" or "1 hour and 15 minutes" -> (seconds, end) or None
+    total = 0
+    end = None
+    while True:
+        match = _UNIT_RE.match(text, pos)
+        if not match:
+            break
+        total += int(match.group(1)) * UNIT_SECONDS[match.group(2)[0].lower()]
+        end = match.end()
+        pos = _SEPARATOR_RE.match(text, end).end()
+    if end is None or total > MAX_DURATION_SECONDS:
+        return None
+    return total, end
+
+def _parse_day(match, text: str, now: datetime, tz):
+    day = match.group(1).lower()
+    local_now = now.astimezone(tz)
+    clock_match = _CLOCK_RE.match(text, match.end())
+    if clock_match:
+        clock = _clock_from_match(clock_match)
+        if clock is None:
+            return None
+        end = clock_match.end()
+    else:
+        clock = (TONIGHT_HOUR if day == "tonight" else DEFAULT_HOUR, 0)
+        end = match.end(1)
+    if day in ("today", "tonight"):
+        offset = 0
+    elif day.startswith("tom") or day.startswith("tmr"):
+        offset = 1
+    else:
+        offset = (WEEKDAYS.index(day[:3]) - local_now.weekday()) % 7
+    target = (local_now + timedelta(days=offset)).replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+    if day[:3] in WEEKDAYS and target <= local_now:
+        target += timedelta(days=7)
+    return target, end
+
+def parse_reminder_input(text: str, now: datetime = None, tz=timezone.utc):
+    # Parse the time expression at the start of a reminder ("10m drink water",
+    # "tomorrow 9am standup", "2025-01-01T00:00Z new year"). Returns None if there isn't one.
+    now = now or datetime.now(timezone.utc)
+    pos = _LEAD_RE.match(text).end()
+
+    iso_match = _ISO_RE.match(text, pos)
+    if iso_match:
+        try:
+            when = datetime.fromisoformat(iso_match.group(0).upper().replace(" ", "T"))
+        except ValueError:
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=tz)
+        result = ParsedTime("absolute", when=when.astimezone(timezone.utc), tz=tz, end=iso_match.end())
+    elif (day_match := _DAY_RE.match(text, pos)) and (day := _parse_day(day_match, text, now, tz)):
+        when, end = day
+        result = ParsedTime("absolute", when=when.astimezone(timezone.utc), tz=tz, end=end)
+    elif duration := parse_duration(text, pos):
+        seconds, end = duration
+        result = ParsedTime("duration", seconds=seconds, tz=tz, end=end)
+    elif clock_match := _CLOCK_RE.match(text, pos):
+        clock = _clock_from_match(clock_match)
+        if clock is None:
+            return None
+        result = ParsedTime("clock", hour=clock[0], minute=clock[1], tz=tz, end=clock_match.end())
+    else:
+        return None
+    result.message = text[result.end:].strip()
+    return result
@@ -0,0 +1,39 @@
+# usage.py
+# Write-behind buffer for command usage counters
+
+import uuid
+
+class UsageBuffer:
+    # Counts command uses in memory keyed by (user_id, command_name) until the next flush.
+    # Increments are exact: each flush is a batch with its own id, and a batch that failed (or
+    # timed out after being applied) is resent unchanged with the same id, which storage applies
+    # at most once. New uses wait for the next batch meanwhile.
+    def __init__(self):
+        self._counts = {}
+        self._flushing = {}  # Drained but not yet confirmed written
+        self._flush_id = None
+
+    def __len__(self):
+        return len(self._counts)
+
+    def increment(self, user_id: str, command_name: str, amount: int = 1):
+        key = (user_id, command_name)
+        self._counts[key] = self._counts.get(key, 0) + amount
+
+    def drain(self):
+        # -> (flush_id, counts) to write: the unconfirmed batch again if there is one
+        if not self._flushing:
+            self._flushing, self._counts = self._counts, {}
+            self._flush_id = uuid.uuid4().hex
+        return self._flush_id, self._flushing
+
+    def flushed(self):
+        self._flushing = {}
+        self._flush_id = None
+
+    def pending(self) -> dict:
+        # Everything not yet reflected in Supabase, including a flush in progress
+        pending = dict(self._flushing)
+        for key, amount in self._counts.items():
+            pending[key] = pending.get(key, 0) + amount
+        return pending
@@ -1,38 +1,67 @@
 # utility_commands.py
 # Utility commands like ping and stats
 
+import logging
 import discord
 from discord import app_commands
+from discord.ext import tasks
 import time
-import aiohttp
+import asyncio
 from embeds import CustomEmbed
-from database import fetch_data
-from config import SUPABASE_URL, SUPABASE_HEADERS
+from storage import storage
+from usage import UsageBuffer
+from stats import StatsRollup
+from ratelimit import rate_limit
+from config import USAGE_FLUSH_SECONDS, STATS_RECONCILE_SECONDS, STATS_USER_CACHE_SIZE
 
-# Helper to track command usage in Supabase
+logger = logging.getLogger(__name__)
+
+# Command usage is counted in memory and written to storage in batches by flush_command_usage
+usage_buffer = UsageBuffer()
+_flush_lock = asyncio.Lock()
+# Totals served by /stats, bumped on every command and re-synced by reconcile_stats
+stats_rollup = StatsRollup(STATS_USER_CACHE_SIZE)
+
+# Helper to track command usage
 async def track_command_usage(user_id: str, command_name: str):
-    async with aiohttp.ClientSession() as session:
-        # Check if entry exists
-        url = f"{SUPABASE_URL}/command_usage?user_id=eq.{user_id}&command_name=eq.{command_name}"
-        async with session.get(url, headers=SUPABASE_HEADERS) as response:
-            if response.status == 200:
-                data = await response.json()
-                if data:
-                    # Entry exists, increment usage_count
-                    entry = data[0]
-                    patch_url = f"{SUPABASE_URL}/command_usage?id=eq.{entry['id']}"
-                    async with session.patch(patch_url, headers=SUPABASE_HEADERS, json={"usage_count": entry["usage_count"] + 1}) as patch_response:
-                        if patch_response.status not in (200, 204):
-                            print(f"Failed to update command usage: {await patch_response.text()}")
-                else:
-                    # No entry, create one
-                    post_url = f"{SUPABASE_URL}/command_usage"
-                    payload = {"user_id": user_id, "command_name": command_name, "usage_count": 1}
-                    async with session.post(post_url, headers=SUPABASE_HEADERS, json=payload) as post_response:
-                        if post_response.status != 201:
-                            print(f"Failed to create command usage: {await post_response.text()}")
+    usage_buffer.increment(user_id, command_name)
+    stats_rollup.record(user_id, command_name)
+
+async def flush_usage():
+    async with _flush_lock:
+        flush_id, counts = usage_buffer.drain()
+        if not counts:
+            return
+        increments = [
+            {"user_id": user_id, "command_name": command_name, "delta": delta}
+            for (user_id, command_name), delta in counts.items()
+        ]
+        try:
+            ok = await storage.increment_command_usage(increments, flush_id)
+        except Exception as e:
+            logger.error("Failed to flush command usage (%d counters): %s", len(increments), e)
+            ok = False
+        # A failed batch stays in the buffer and is resent with the same id next time
+        if ok:
+            usage_buffer.flushed()
+
+@tasks.loop(seconds=USAGE_FLUSH_SECONDS)
+async def flush_command_usage():
+    await flush_usage()
+
+async def reconcile_stats_totals():
+    # Rebuilds the persisted rollup server-side and reloads it; the only aggregate query /stats needs
+    totals = await storage.reconcile_command_usage_totals()
+    if totals is None:
+        return
+    stats_rollup.load_totals(totals, usage_buffer.pending())
+
+@tasks.loop(seconds=STATS_RECONCILE_SECONDS)
+async def reconcile_stats():
+    await reconcile_stats_totals()
 
 @app_commands.command(name="ping", description="Check the bot's latency")
+@rate_limit(5, 30)
 async def ping(interaction: discord.Interaction):
     # Track command usage
     await track_command_usage(str(interaction.user.id), "ping")
@@ -40,53 +69,41 @@ async def ping(interaction: discord.Interaction):
     # Bot latency
     bot_latency = round(interaction.client.latency * 1000)  # Convert to milliseconds
 
-    # Supabase latency
+    # Database latency
     start_time = time.time()
-    async with aiohttp.ClientSession() as session:
-        url = f"{SUPABASE_URL}/command_usage?limit=1"  # Small query to test latency
-        async with session.get(url, headers=SUPABASE_HEADERS) as response:
-            supabase_latency = round((time.time() - start_time) * 1000)  # Time in milliseconds
+    await storage.ping()  # Smallest possible query to test latency
+    database_latency = round((time.time() - start_time) * 1000)  # Time in milliseconds
 
     # Create embed with JubJub's colors
-    embed = discord.Embed(
-        title="🏓 Pong!",
-        description="Here’s how fast I’m vibing!",
-        color=discord.Color.from_rgb(255, 0, 0)  # Red like JubJub's eyes
-    )
+    embed = CustomEmbed.pong()
     embed.add_field(name="Bot Latency", value=f"**{bot_latency}ms**", inline=True)
-    embed.add_field(name="Supabase Latency", value=f"**{supabase_latency}ms**", inline=True)
-    embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")  # JubJub's PFP
-    embed.set_footer(text="JubJub’s got your back!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-    embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
+    embed.add_field(name=f"{storage.name} Latency", value=f"**{database_latency}ms**", inline=True)
 
     await interaction.response.send_message(embed=embed)
 
 @app_commands.command(name="stats", description="Check bot usage stats")
+@rate_limit(3, 30)
+@rate_limit(20, 60, scope="guild")
 async def stats(interaction: discord.Interaction):
     # Track command usage
     await track_command_usage(str(interaction.user.id), "stats")
 
-    # Fetch global stats
-    global_stats = await fetch_data("command_usage", "")
-    total_commands = sum(entry["usage_count"] for entry in global_stats)
-    
-    # Break down by command
-    command_breakdown = {}
-    for entry in global_stats:
-        cmd = entry["command_name"]
-        command_breakdown[cmd] = command_breakdown.get(cmd, 0) + entry["usage_count"]
-
-    # Fetch user stats
-    user_stats = await fetch_data("command_usage", f"?user_id=eq.{interaction.user.id}")
-    user_total = sum(entry["usage_count"] for entry in user_stats)
-    user_breakdown = {entry["command_name"]: entry["usage_count"] for entry in user_stats}
+    # Global stats come from the in-memory rollup, loaded once if reconciliation hasn't run yet
+    if not stats_rollup.loaded:
+        await reconcile_stats_totals()
+    total_commands = stats_rollup.total
+    command_breakdown = stats_rollup.by_command
+
+    # User stats are fetched once per user, then kept up to date in memory
+    user_id = str(interaction.user.id)
+    user_breakdown = stats_rollup.get_user(user_id)
+    if user_breakdown is None:
+        user_rows = await storage.fetch_command_usage(user_id)
+        user_breakdown = stats_rollup.load_user(user_id, user_rows, usage_buffer.pending())
+    user_total = sum(user_breakdown.values())
 
     # Create embed with JubJub's colors
-    embed = discord.Embed(
-        title="📊 JubJub’s Stats!",
-        description="Check out how much action I’ve been getting! 🖤🤍❤️💛",
-        color=discord.Color.from_rgb(255, 255, 255)  # White for JubJub's hair
-    )
+    embed = CustomEmbed.stats()
     # Global stats
     embed.add_field(
         name="Global Usage",
@@ -99,9 +116,5 @@ async def stats(interaction: discord.Interaction):
                       "\n".join(f"**{cmd.capitalize()}:** {count}" for cmd, count in user_breakdown.items()) \
                       if user_breakdown else "You haven’t used any commands yet!"
     embed.add_field(name=f"{interaction.user.name}’s Stats", value=user_stats_text, inline=False)
-    
-    embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-    embed.set_footer(text="JubJub’s keeping score!", icon_url="https://cdn.discordapp.com/attachments/798659460276158527/1352802990536396893/JubJubPFP.png")
-    embed.set_image(url="https://cdn.discordapp.com/attachments/798659460276158527/1352803085373673582/JubJubBanner.jpg")
 
     await interaction.response.send_message(embed=embed)
\ No newline at end of file